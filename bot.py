@@ -1,15 +1,24 @@
 """Главный файл бота"""
 import asyncio
 import logging
+import signal
 import sys
+from multiprocessing.connection import Connection
+from typing import Optional, Tuple
 
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
-from aiogram.fsm.storage.memory import MemoryStorage
 
-from config import BOT_TOKEN, ADMIN_IDS
-from database import Database
+from config import BOT_TOKEN, ADMIN_IDS, DELIVERY_MODE, WORKER_PROCESSES
+from database import Database, SQLiteStorage, RetryPolicy
+from services.fsm_sweeper import run_fsm_sweeper
+from services.outbox_worker import run_outbox_worker
+from services.fsm_transaction import fsm_transaction_middleware
+from services.send_scheduler import SendScheduler
+from services.fanout import fan_out_in_background, wait_background_fanouts
+from services.webhook import run_webhook, is_loopback_host
+from services.workers import Supervisor, WorkerLink, RemoteWriter, serve_supervisor, MESSAGE_CHANGE
 
 # Импортируем роутеры
 from handlers import start, client, trainer, admin
@@ -23,34 +32,70 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-async def main():
-    """Главная функция запуска бота"""
-    
-    # Проверяем наличие токена
-    if not BOT_TOKEN:
-        logger.error("❌ BOT_TOKEN не установлен! Проверьте файл .env")
-        return
-    
-    if not ADMIN_IDS:
-        logger.warning("⚠️ ADMIN_ID не установлен! Функции администратора будут недоступны.")
-    else:
-        logger.info(f"✅ Администраторов: {len(ADMIN_IDS)}")
-    
-    # Инициализируем бота и диспетчер
+def create_bot(global_rate: float) -> Tuple[Bot, SendScheduler]:
+    """Создать бота; все его запросы к Bot API идут через очередь с лимитами Telegram"""
     bot = Bot(
         token=BOT_TOKEN,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML)
     )
     
-    # Используем MemoryStorage для FSM
-    storage = MemoryStorage()
-    dp = Dispatcher(storage=storage)
+    from config import SEND_CHAT_RATE, SEND_CHAT_BURST, SEND_MAX_RETRIES
+    scheduler = SendScheduler(
+        global_rate=global_rate,
+        chat_rate=SEND_CHAT_RATE,
+        chat_burst=SEND_CHAT_BURST,
+        max_retries=SEND_MAX_RETRIES
+    )
+    bot.session.middleware(scheduler)
+    return bot, scheduler
+
+
+async def create_database(writer: Optional[RemoteWriter] = None) -> Database:
+    """
+    Открыть базу данных и довести схему до актуальной версии
     
-    # Инициализируем базу данных
-    from config import DATABASE_PATH
-    db = Database(DATABASE_PATH)
+    Воркер передает writer: его записи выполняет супервизор, а схему воркер не трогает.
+    """
+    from config import (
+        DATABASE_PATH, DATABASE_POOL_SIZE, DATABASE_WRITE_WINDOW, DATABASE_WRITE_BATCH, DATABASE_PRAGMA_PROFILE,
+        DATABASE_RETRY_BASE_DELAY, DATABASE_RETRY_MAX_DELAY, DATABASE_RETRY_DEADLINE,
+        TRAINER_CACHE_SIZE, TRAINER_CACHE_TTL, LIKED_CACHE_SIZE
+    )
+    db = Database(
+        DATABASE_PATH,
+        pool_size=DATABASE_POOL_SIZE,
+        trainer_cache_size=TRAINER_CACHE_SIZE,
+        trainer_cache_ttl=TRAINER_CACHE_TTL,
+        liked_cache_size=LIKED_CACHE_SIZE,
+        write_window=DATABASE_WRITE_WINDOW,
+        write_batch_size=DATABASE_WRITE_BATCH,
+        pragma_profile=DATABASE_PRAGMA_PROFILE,
+        retry_policy=RetryPolicy(
+            base_delay=DATABASE_RETRY_BASE_DELAY,
+            max_delay=DATABASE_RETRY_MAX_DELAY,
+            deadline=DATABASE_RETRY_DEADLINE
+        ),
+        writer=writer
+    )
     await db.init_db()
     logger.info("✅ База данных инициализирована")
+    pragmas = ", ".join(f"{name}={value}" for name, value in db.applied_pragmas.items()) or "без изменений"
+    logger.info(f"⚙️ Профиль SQLite {db.pragma_profile}: {pragmas}")
+    return db
+
+
+def create_storage(db: Database) -> SQLiteStorage:
+    """FSM-сессии храним в той же базе, чтобы они переживали перезапуск"""
+    from config import FSM_CACHE_SIZE, FSM_FLUSH_INTERVAL
+    return SQLiteStorage(db, cache_size=FSM_CACHE_SIZE, flush_interval=FSM_FLUSH_INTERVAL)
+
+
+def create_dispatcher(db: Database, storage: SQLiteStorage) -> Dispatcher:
+    """Диспетчер со всеми middleware и роутерами"""
+    dp = Dispatcher(storage=storage)
+    
+    # Все изменения FSM-состояния за апдейт записываем один раз
+    dp.update.outer_middleware(fsm_transaction_middleware)
     
     # Регистрируем middleware для передачи db в handlers
     @dp.update.outer_middleware()
@@ -66,25 +111,234 @@ async def main():
     dp.include_router(admin.router)
     
     logger.info("✅ Роутеры зарегистрированы")
+    return dp
+
+
+def notify_admins_started(bot: Bot):
+    """Уведомляем всех админов о запуске"""
+    if not ADMIN_IDS:
+        return
     
-    # Уведомляем всех админов о запуске
-    if ADMIN_IDS:
-        for admin_id in ADMIN_IDS:
-            try:
-                await bot.send_message(
-                    admin_id,
-                    "🤖 <b>Бот запущен!</b>\n\n"
-                    "Tinder для тренеров готов к работе."
-                )
-            except Exception as e:
-                logger.warning(f"Не удалось отправить уведомление админу {admin_id}: {e}")
-    
-    # Запускаем polling
-    logger.info("🚀 Бот запущен!")
-    try:
+    async def send_startup_notice(admin_id: int):
+        await bot.send_message(
+            admin_id,
+            "🤖 <b>Бот запущен!</b>\n\n"
+            "Tinder для тренеров готов к работе."
+        )
+    
+    fan_out_in_background(ADMIN_IDS, send_startup_notice, "Уведомление о запуске")
+
+
+def start_fsm_sweeper(storage: SQLiteStorage) -> asyncio.Task:
+    """Запускаем фоновую очистку заброшенных FSM-сессий"""
+    from config import FSM_SESSION_TTLS, FSM_SWEEP_INTERVAL
+    return asyncio.create_task(
+        run_fsm_sweeper(storage, FSM_SESSION_TTLS, FSM_SWEEP_INTERVAL)
+    )
+
+
+def start_outbox_worker(bot: Bot, db: Database) -> asyncio.Task:
+    """Запускаем фоновую отправку уведомлений из outbox"""
+    from config import OUTBOX_POLL_INTERVAL, OUTBOX_BATCH_SIZE, OUTBOX_MAX_ATTEMPTS
+    return asyncio.create_task(
+        run_outbox_worker(bot, db, OUTBOX_POLL_INTERVAL, OUTBOX_BATCH_SIZE, OUTBOX_MAX_ATTEMPTS)
+    )
+
+
+async def receive_updates(dp: Dispatcher, bot: Bot):
+    """Получать апдейты выбранным способом (DELIVERY_MODE), пока бот работает"""
+    if DELIVERY_MODE == "webhook":
+        from config import WEBHOOK_URL, WEBHOOK_HOST, WEBHOOK_PORT, WEBHOOK_PATH, WEBHOOK_SECRET, WEBHOOK_CONCURRENCY
+        await run_webhook(
+            dp,
+            bot,
+            host=WEBHOOK_HOST,
+            port=WEBHOOK_PORT,
+            path=WEBHOOK_PATH,
+            secret_token=WEBHOOK_SECRET or None,
+            concurrency=WEBHOOK_CONCURRENCY,
+            url=WEBHOOK_URL or None
+        )
+    else:
+        # getUpdates не работает, пока зарегистрирован webhook
+        await bot.delete_webhook()
         await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
+
+
+async def close_all(db: Database, scheduler: SendScheduler, bot: Bot, storage: Optional[SQLiteStorage] = None):
+    """Вывести статистику и закрыть ресурсы процесса"""
+    cache_stats = db.trainer_cache_stats()
+    logger.info(
+        f"📊 Кэш анкет: попаданий {cache_stats.hits}, промахов {cache_stats.misses} "
+        f"({cache_stats.hit_rate:.0%}), вытеснено {cache_stats.evictions}, "
+        f"размер {cache_stats.size}/{cache_stats.maxsize}"
+    )
+    send_stats = scheduler.stats()
+    logger.info(
+        f"📨 Очередь отправки: запросов {send_stats.sent}, "
+        f"среднее ожидание {send_stats.avg_wait:.2f} с, максимум в очереди {send_stats.max_queued}, "
+        f"повторов после retry_after {send_stats.retries}, отказов {send_stats.failed}"
+    )
+    # Даем дойти рассылкам админам, запущенным перед остановкой
+    await wait_background_fanouts(timeout=5)
+    if storage is not None:
+        await storage.close()
+    await db.close()
+    writer_stats = db.writer_stats()
+    if writer_stats.batches:
+        logger.info(
+            f"💾 Запись в БД: операций {writer_stats.operations}, транзакций {writer_stats.batches}, "
+            f"в среднем {writer_stats.avg_batch:.1f} операций на транзакцию, максимум {writer_stats.max_batch}"
+        )
+    else:
+        # Записи воркера выполняет и считает супервизор
+        logger.info(f"💾 Запись в БД: операций {writer_stats.operations}")
+    retry_stats = db.retry_stats()
+    logger.info(f"🔁 Занятая БД: повторов {retry_stats.retries}, отказов {retry_stats.give_ups}")
+    await scheduler.close()
+    await bot.session.close()
+
+
+async def run_single_process():
+    """Обычный режим: получение и обработка апдейтов в одном процессе"""
+    from config import SEND_GLOBAL_RATE
+    bot, scheduler = create_bot(SEND_GLOBAL_RATE)
+    db = await create_database()
+    storage = create_storage(db)
+    dp = create_dispatcher(db, storage)
+    
+    notify_admins_started(bot)
+    sweeper_task = start_fsm_sweeper(storage)
+    outbox_task = start_outbox_worker(bot, db)
+    
+    logger.info(f"🚀 Бот запущен! Получение апдейтов: {DELIVERY_MODE}")
+    try:
+        await receive_updates(dp, bot)
+    finally:
+        sweeper_task.cancel()
+        outbox_task.cancel()
+        await close_all(db, scheduler, bot, storage)
+
+
+async def run_supervisor(workers: int):
+    """
+    Режим супервизора: этот процесс получает апдейты и раздает их воркерам
+    по user_id, выполняет все записи в БД одним соединением, отправляет
+    уведомления из outbox и очищает заброшенные FSM-сессии
+    """
+    from config import SEND_GLOBAL_RATE
+    # Глобальный лимит Telegram делим между всеми процессами
+    bot, scheduler = create_bot(SEND_GLOBAL_RATE / (workers + 1))
+    # Миграции применяются здесь, до запуска воркеров
+    db = await create_database()
+    
+    supervisor = Supervisor(workers, worker_main, on_write=db.write, on_change=db.apply_change)
+    db.on_change = supervisor.publish_change
+    # Сессии обслуживают воркеры, а хранилище здесь нужно только для очистки таблицы
+    storage = create_storage(db)
+    
+    # FSM здесь не нужен: без него на каждый апдейт не заводится запись
+    # в MemoryStorage и не берется блокировка на пользователя
+    dp = Dispatcher(disable_fsm=True)
+    
+    @dp.update.outer_middleware()
+    async def route_update(handler, event, data):
+        """Передать апдейт воркеру пользователя вместо обработки здесь"""
+        user = data.get("event_from_user")
+        key = user.id if user is not None else event.update_id
+        supervisor.route(key, event.model_dump(mode="json", exclude_unset=True, by_alias=True))
+    
+    # Роутеры нужны только, чтобы запросить у Telegram используемые типы апдейтов
+    dp.include_router(start.router)
+    dp.include_router(client.router)
+    dp.include_router(trainer.router)
+    dp.include_router(admin.router)
+    
+    supervisor.start()
+    notify_admins_started(bot)
+    sweeper_task = start_fsm_sweeper(storage)
+    outbox_task = start_outbox_worker(bot, db)
+    
+    logger.info(f"🚀 Бот запущен! Получение апдейтов: {DELIVERY_MODE}, воркеров: {workers}")
+    try:
+        await receive_updates(dp, bot)
+    finally:
+        sweeper_task.cancel()
+        outbox_task.cancel()
+        # Воркеры дописывают данные через супервизора - БД закрываем после них
+        await supervisor.close()
+        await close_all(db, scheduler, bot, storage)
+
+
+async def run_worker(index: int, conn: Connection):
+    """Воркер: обрабатывает апдейты своих пользователей, полученные от супервизора"""
+    from config import SEND_GLOBAL_RATE
+    link = WorkerLink(conn)
+    writer = RemoteWriter(link)
+    bot, scheduler = create_bot(SEND_GLOBAL_RATE / (WORKER_PROCESSES + 1))
+    # Записи уходят супервизору: в файл базы пишет только его соединение
+    db = await create_database(writer)
+    # Изменения кэшей уходят супервизору, а он пересылает их остальным процессам
+    db.on_change = lambda event, args: link.send(MESSAGE_CHANGE, event, args)
+    storage = create_storage(db)
+    dp = create_dispatcher(db, storage)
+    
+    async def handle_update(update: dict):
+        try:
+            await dp.feed_raw_update(bot, update)
+        except Exception as e:
+            logger.error(f"❌ Ошибка обработки апдейта {update.get('update_id')}: {e}", exc_info=True)
+    
+    logger.info(f"🚀 Воркер {index} запущен")
+    try:
+        # Хранилище и БД закрываются, пока канал еще читается: их записи выполняет супервизор
+        await serve_supervisor(
+            link, handle_update, db.apply_change, writer,
+            shutdown=lambda: close_all(db, scheduler, bot, storage)
+        )
     finally:
-        await bot.session.close()
+        link.close()
+
+
+def worker_main(index: int, conn: Connection):
+    """Точка входа процесса-воркера"""
+    # Ctrl+C получает вся группа процессов, а воркеров останавливает супервизор
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(run_worker(index, conn))
+
+
+async def main():
+    """Главная функция запуска бота"""
+    
+    # Проверяем наличие токена
+    if not BOT_TOKEN:
+        logger.error("❌ BOT_TOKEN не установлен! Проверьте файл .env")
+        return
+    
+    if not ADMIN_IDS:
+        logger.warning("⚠️ ADMIN_ID не установлен! Функции администратора будут недоступны.")
+    else:
+        logger.info(f"✅ Администраторов: {len(ADMIN_IDS)}")
+    
+    if DELIVERY_MODE not in ("polling", "webhook"):
+        logger.error(f"❌ Неизвестный DELIVERY_MODE: {DELIVERY_MODE} (ожидается polling или webhook)")
+        return
+    
+    if DELIVERY_MODE == "webhook":
+        from config import WEBHOOK_HOST, WEBHOOK_SECRET
+        # Без секрета любой, кто достучится до порта, сможет прислать апдейт
+        # от имени любого пользователя, в том числе администратора
+        if not WEBHOOK_SECRET and not is_loopback_host(WEBHOOK_HOST):
+            logger.error(
+                f"❌ WEBHOOK_SECRET не установлен! Webhook на {WEBHOOK_HOST} принял бы апдейты от любого отправителя. "
+                "Задайте WEBHOOK_SECRET или слушайте только локальный адрес (WEBHOOK_HOST=127.0.0.1)"
+            )
+            return
+    
+    if WORKER_PROCESSES > 1:
+        await run_supervisor(WORKER_PROCESSES)
+    else:
+        await run_single_process()
 
 
 if __name__ == "__main__":
@@ -94,4 +348,3 @@ if __name__ == "__main__":
         logger.info("⏹ Бот остановлен пользователем")
     except Exception as e:
         logger.error(f"❌ Критическая ошибка: {e}", exc_info=True)
-
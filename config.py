@@ -29,6 +29,77 @@ ADMIN_ID = ADMIN_IDS[0] if ADMIN_IDS else 0
 # Путь к базе данных
 DATABASE_PATH = os.getenv("DATABASE_PATH", "trainers_tinder.db")
 
+# Количество постоянных соединений с базой данных
+DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", "4"))
+
+# Профиль настроек SQLite из database/pragmas.py: balanced (WAL, synchronous=NORMAL),
+# durable (WAL, synchronous=FULL) или sqlite_defaults
+DATABASE_PRAGMA_PROFILE = os.getenv("DATABASE_PRAGMA_PROFILE", "balanced")
+
+# Групповая фиксация записей: сколько ждать попутных операций (секунды)
+# и сколько операций максимум фиксировать одной транзакцией
+DATABASE_WRITE_WINDOW = float(os.getenv("DATABASE_WRITE_WINDOW", "0.002"))
+DATABASE_WRITE_BATCH = int(os.getenv("DATABASE_WRITE_BATCH", "100"))
+
+# Повторы при занятой базе (database is locked): начальная и максимальная пауза
+# между попытками и общий срок на одну операцию (секунды)
+DATABASE_RETRY_BASE_DELAY = float(os.getenv("DATABASE_RETRY_BASE_DELAY", "0.05"))
+DATABASE_RETRY_MAX_DELAY = float(os.getenv("DATABASE_RETRY_MAX_DELAY", "1.0"))
+DATABASE_RETRY_DEADLINE = float(os.getenv("DATABASE_RETRY_DEADLINE", "15"))
+
+# Кэш анкет тренеров: максимальное число записей и время жизни (секунды)
+TRAINER_CACHE_SIZE = int(os.getenv("TRAINER_CACHE_SIZE", "1000"))
+TRAINER_CACHE_TTL = float(os.getenv("TRAINER_CACHE_TTL", "300"))
+
+# Сколько клиентов держать в кэше лайкнутых анкет
+LIKED_CACHE_SIZE = int(os.getenv("LIKED_CACHE_SIZE", "5000"))
+
+# FSM-сессии: сколько держать в памяти и как часто сбрасывать изменения в БД (секунды)
+FSM_CACHE_SIZE = int(os.getenv("FSM_CACHE_SIZE", "10000"))
+FSM_FLUSH_INTERVAL = float(os.getenv("FSM_FLUSH_INTERVAL", "1.0"))
+
+# Время простоя (секунды), после которого FSM-сессия удаляется, по группам состояний
+FSM_SESSION_TTLS = {
+    # Просмотр анкет и лайков клиентом (сессии без состояния)
+    "browse": float(os.getenv("FSM_BROWSE_TTL", "86400")),
+    "TrainerRegistration": float(os.getenv("FSM_REGISTRATION_TTL", "604800")),
+    "AdminAddLikes": float(os.getenv("FSM_ADMIN_TTL", "3600")),
+}
+# Как часто запускать очистку (секунды)
+FSM_SWEEP_INTERVAL = float(os.getenv("FSM_SWEEP_INTERVAL", "600"))
+
+# Лимиты отправки в Telegram: сообщений в секунду всего и в один чат (с допустимым всплеском),
+# и сколько раз повторять запрос после ответа retry_after
+SEND_GLOBAL_RATE = float(os.getenv("SEND_GLOBAL_RATE", "30"))
+SEND_CHAT_RATE = float(os.getenv("SEND_CHAT_RATE", "1"))
+SEND_CHAT_BURST = float(os.getenv("SEND_CHAT_BURST", "3"))
+SEND_MAX_RETRIES = int(os.getenv("SEND_MAX_RETRIES", "3"))
+
+# Сколько админов уведомлять одновременно
+ADMIN_FANOUT_CONCURRENCY = int(os.getenv("ADMIN_FANOUT_CONCURRENCY", "5"))
+
+# Outbox уведомлений: период опроса (секунды), размер пачки и число попыток доставки
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "5"))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+
+# Способ получения апдейтов: 'polling' (по умолчанию) или 'webhook'
+DELIVERY_MODE = os.getenv("DELIVERY_MODE", "polling").strip().lower()
+
+# Webhook: адрес и путь встроенного сервера, секрет из заголовка X-Telegram-Bot-Api-Secret-Token
+# и сколько апдейтов обрабатывать одновременно. WEBHOOK_URL регистрируется в Telegram;
+# если он пуст, апдейты присылает локальный прокси или другой отправитель
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+WEBHOOK_CONCURRENCY = int(os.getenv("WEBHOOK_CONCURRENCY", "50"))
+
+# Сколько процессов-воркеров обрабатывают апдейты. 1 - все в одном процессе;
+# больше 1 - этот процесс становится супервизором и раздает апдейты воркерам по user_id
+WORKER_PROCESSES = max(1, int(os.getenv("WORKER_PROCESSES", "1")))
+
 # Стоимость размещения анкеты в месяц (в рублях)
 PLACEMENT_COST = int(os.getenv("PLACEMENT_COST", "100"))
 
@@ -1,5 +1,6 @@
 """Database package"""
 from .database import Database
+from .fsm_storage import SQLiteStorage
+from .retry import RetryPolicy, WriteNotApplied
 
-__all__ = ['Database']
-
+__all__ = ['Database', 'SQLiteStorage', 'RetryPolicy', 'WriteNotApplied']
@@ -0,0 +1,96 @@
+"""Кэши в памяти процесса"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, Optional
+
+
+@dataclass
+class CacheStats:
+    """Статистика кэша для подбора его размера"""
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+    
+    @property
+    def hit_rate(self) -> float:
+        """Доля попаданий среди всех обращений"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUCache:
+    """LRU-кэш с необязательным временем жизни записей"""
+    
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = max(1, maxsize)
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return self._lookup(key) is not None
+    
+    def _lookup(self, key: Hashable) -> Optional[tuple]:
+        """Найти живую запись, просроченную - удалить"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Получить значение и отметить его как недавно использованное"""
+        entry = self._lookup(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+    
+    def set(self, key: Hashable, value: Any):
+        """Положить значение, вытеснив самые старые записи при переполнении"""
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+    
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Получить значение, не трогая порядок вытеснения и статистику"""
+        entry = self._lookup(key)
+        return entry[0] if entry is not None else default
+    
+    def values(self) -> list:
+        """Значения всех записей (включая еще не удаленные просроченные)"""
+        return [entry[0] for entry in self._data.values()]
+    
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Удалить запись, вернуть ее значение"""
+        entry = self._data.pop(key, None)
+        return entry[0] if entry is not None else default
+    
+    def clear(self):
+        """Очистить кэш (статистика сохраняется)"""
+        self._data.clear()
+    
+    def stats(self) -> CacheStats:
+        """Текущая статистика кэша"""
+        return CacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            size=len(self._data),
+            maxsize=self.maxsize,
+        )
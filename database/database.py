@@ -1,124 +1,368 @@
 """Работа с базой данных"""
+import asyncio
+import calendar
+import functools
+import time
 import aiosqlite
-from typing import Optional, List
-from .models import User, Client, Trainer, Like
+from contextlib import asynccontextmanager
+from typing import Any, Optional, List, Set, FrozenSet, Dict, Tuple, AsyncIterator, Callable
+from .models import (
+    User, Client, Trainer, Like, LikedTrainer, LikeResult, DirectionSnapshot, OutboxMessage, Page, StatsSnapshot,
+    column_list
+)
+from .migrations import apply_migrations
+from .cache import LRUCache, CacheStats
+from .writer import BoundWrite, DatabaseWriter, WriteOperation, WriterStats
+from .pragmas import DEFAULT_PROFILE, apply_pragmas, get_profile
+from .retry import RetryPolicy, RetryStats, is_retryable_read, is_retryable_write
+
+# Формат CURRENT_TIMESTAMP в SQLite (UTC)
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Явные списки колонок: строки выборки передаются в модели позиционно
+USER_COLUMNS = column_list(User)
+CLIENT_COLUMNS = column_list(Client)
+TRAINER_COLUMNS = column_list(Trainer)
+TRAINER_T_COLUMNS = column_list(Trainer, "t")  # Для запросов с псевдонимом trainers t
+LIKE_COLUMNS = column_list(Like)
+OUTBOX_COLUMNS = column_list(OutboxMessage)
+
+
+def encode_cursor(created_at: str, row_id: int) -> str:
+    """Курсор страницы: время создания (unix) и ID последней строки - коротко для callback_data"""
+    timestamp = calendar.timegm(time.strptime(created_at, TIMESTAMP_FORMAT))
+    return f"{timestamp}.{row_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Разобрать курсор обратно в (created_at, id)"""
+    timestamp, row_id = cursor.split(".")
+    return time.strftime(TIMESTAMP_FORMAT, time.gmtime(int(timestamp))), int(row_id)
+
+
+def retry_on_busy(method):
+    """Повторять чтение, пока база занята (чтение безопасно повторять всегда)"""
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        return await self.retry.run(lambda: method(self, *args, **kwargs), is_retryable_read)
+    
+    return wrapper
 
 
 class Database:
     """Класс для работы с SQLite базой данных"""
     
-    def __init__(self, db_path: str):
+    def __init__(
+        self,
+        db_path: str,
+        pool_size: int = 4,
+        trainer_cache_size: int = 1000,
+        trainer_cache_ttl: Optional[float] = 300,
+        liked_cache_size: int = 5000,
+        write_window: float = 0.002,
+        write_batch_size: int = 100,
+        pragma_profile: str = DEFAULT_PROFILE,
+        retry_policy: Optional[RetryPolicy] = None,
+        writer: Optional[Any] = None
+    ):
         self.db_path = db_path
+        self.pool_size = max(1, pool_size)
+        # Профиль PRAGMA (database/pragmas.py) для каждого соединения
+        self.pragma_profile = pragma_profile
+        self._pragmas = get_profile(pragma_profile)
+        # Значения, которые SQLite фактически принял (для лога при запуске)
+        self.applied_pragmas: Dict[str, Any] = {}
+        # Пул постоянных соединений только для чтения (открывается в init_db)
+        self._pool: Optional[asyncio.Queue] = None
+        self._connections: List[aiosqlite.Connection] = []
+        # Повторы при конкуренции за блокировки (busy / locked)
+        self.retry = retry_policy or RetryPolicy()
+        # Все записи идут через одно соединение с групповой фиксацией. Воркер
+        # передает свой writer, который отправляет операции процессу-владельцу записи
+        self._writer = writer or DatabaseWriter(self._connect, window=write_window, max_batch=write_batch_size)
+        # Кэш анкет по ID: читается в get_trainer_by_id, сбрасывается при записи
+        self._trainer_cache = LRUCache(trainer_cache_size, ttl=trainer_cache_ttl)
+        # Растет при каждой инвалидации, чтобы чтение, начатое до записи,
+        # не положило в кэш устаревшую анкету
+        self._trainer_cache_generation = 0
+        # Множества ID лайкнутых тренеров для активных клиентов
+        self._liked_cache = LRUCache(liked_cache_size)
+        self._liked_cache_generation = 0
+        # Общие для всех клиентов снимки ID анкет по направлениям.
+        # Пересобираются только после одобрения, отклонения или удаления анкет
+        self._snapshots: Dict[str, DirectionSnapshot] = {}
+        self._snapshot_version = 0
+        # Будит обработчик outbox, когда появилось новое уведомление
+        self.outbox_event = asyncio.Event()
+        # Получает изменения, о которых нужно знать другим процессам
+        # (режим нескольких воркеров): on_change(событие, аргументы)
+        self.on_change: Optional[Callable[[str, tuple], None]] = None
+        # Применение изменений, пришедших от других процессов
+        self._change_handlers: Dict[str, Callable[..., None]] = {
+            "trainer": self._drop_trainer,
+            "snapshots": self._clear_snapshots,
+            "trainer_likes": self._drop_trainer_likes,
+            "outbox": self.outbox_event.set,
+        }
+    
+    async def _connect(self) -> aiosqlite.Connection:
+        """Открыть соединение и применить к нему профиль настроек"""
+        conn = await aiosqlite.connect(self.db_path)
+        self.applied_pragmas = await apply_pragmas(conn, self._pragmas)
+        return conn
+    
+    async def _open_pool(self):
+        """Открыть пул постоянных соединений"""
+        if self._pool is not None:
+            return
+        
+        pool = asyncio.Queue()
+        for _ in range(self.pool_size):
+            conn = await self._connect()
+            # Пишет только DatabaseWriter - случайная запись мимо него упадет сразу
+            await conn.execute("PRAGMA query_only = ON")
+            self._connections.append(conn)
+            pool.put_nowait(conn)
+        self._pool = pool
+    
+    async def close(self):
+        """Дописать поставленные в очередь операции и закрыть все соединения"""
+        await self._writer.close()
+        connections, self._connections = self._connections, []
+        self._pool = None
+        for conn in connections:
+            await conn.close()
+    
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Взять соединение из пула на время чтения"""
+        pool = self._pool
+        if pool is None:
+            raise RuntimeError("База данных не инициализирована: вызовите init_db()")
+        
+        conn = await pool.get()
+        try:
+            yield conn
+        finally:
+            # Не возвращаем в пул соединение с незавершенной транзакцией
+            # (раньше ее откатывало закрытие соединения)
+            try:
+                if conn.in_transaction:
+                    await conn.rollback()
+            finally:
+                pool.put_nowait(conn)
+    
+    def invalidate_trainer(self, trainer_id: int):
+        """Сбросить закэшированную анкету тренера"""
+        self._drop_trainer(trainer_id)
+        self.publish("trainer", trainer_id)
+    
+    def _drop_trainer(self, trainer_id: int):
+        self._trainer_cache_generation += 1
+        self._trainer_cache.pop(trainer_id)
+    
+    def _invalidate_snapshots(self):
+        """Сбросить снимки направлений после изменения набора одобренных анкет"""
+        self._clear_snapshots()
+        self.publish("snapshots")
+    
+    def _clear_snapshots(self):
+        self._snapshot_version += 1
+        self._snapshots.clear()
+    
+    def _remember_like(self, client_id: int, trainer_id: int):
+        """
+        Добавить лайк в множество клиента, если оно загружено
+        
+        Другим процессам не рассылается: клиент всегда обслуживается одним воркером.
+        """
+        self._liked_cache_generation += 1
+        liked = self._liked_cache.peek(client_id)
+        if liked is not None:
+            liked.add(trainer_id)
+    
+    def _forget_trainer_likes(self, trainer_id: int):
+        """Убрать удаленного тренера из всех загруженных множеств"""
+        self._drop_trainer_likes(trainer_id)
+        self.publish("trainer_likes", trainer_id)
+    
+    def _drop_trainer_likes(self, trainer_id: int):
+        self._liked_cache_generation += 1
+        for liked in self._liked_cache.values():
+            liked.discard(trainer_id)
+    
+    def _notify_outbox(self):
+        """Разбудить обработчик outbox (он может работать в другом процессе)"""
+        self.outbox_event.set()
+        self.publish("outbox")
+    
+    def publish(self, event: str, *args):
+        """Сообщить об изменении другим процессам (если они есть)"""
+        if self.on_change is not None:
+            self.on_change(event, args)
+    
+    def add_change_handler(self, event: str, handler: Callable[..., None]):
+        """Применять событие event от других процессов вызовом handler(*аргументы)"""
+        self._change_handlers[event] = handler
+    
+    def apply_change(self, event: str, args: tuple):
+        """Применить изменение, сделанное другим процессом (без повторной рассылки)"""
+        self._change_handlers[event](*args)
+    
+    async def write(self, operation: WriteOperation) -> Any:
+        """
+        Выполнить operation(db) на соединении для записи и дождаться фиксации
+        
+        Операция выполняется внутри общей транзакции пачки и не вызывает
+        commit() сама; ее исключение откатывает только ее изменения.
+        Если база занята, операция повторяется только тогда, когда известно,
+        что она не применилась (WriteNotApplied).
+        """
+        return await self.retry.run(lambda: self._writer.submit(operation), is_retryable_write)
+    
+    async def _execute_write(self, sql: str, params: tuple = ()):
+        """Записать одним запросом"""
+        await self.write(BoundWrite(self._execute_statement, sql, params))
+    
+    @staticmethod
+    async def _execute_statement(db: aiosqlite.Connection, sql: str, params: tuple):
+        await db.execute(sql, params)
+    
+    def writer_stats(self) -> WriterStats:
+        """Статистика групповой фиксации записей"""
+        return self._writer.stats()
+    
+    def retry_stats(self) -> RetryStats:
+        """Счетчики повторов и отказов из-за занятой базы"""
+        return self.retry.stats()
+    
+    def trainer_cache_stats(self) -> CacheStats:
+        """Статистика кэша анкет (попадания, промахи, размер)"""
+        return self._trainer_cache.stats()
     
     async def init_db(self):
         """Инициализация базы данных"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Таблица пользователей
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    user_id INTEGER PRIMARY KEY,
-                    username TEXT,
-                    role TEXT
-                )
-            """)
-            
-            # Таблица клиентов с лайками
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS clients (
-                    user_id INTEGER PRIMARY KEY,
-                    username TEXT,
-                    likes_count INTEGER DEFAULT 5,
-                    FOREIGN KEY (user_id) REFERENCES users (user_id)
-                )
-            """)
-            
-            # Таблица анкет тренеров
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS trainers (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER UNIQUE,
-                    username TEXT,
-                    direction TEXT NOT NULL,
-                    name TEXT NOT NULL,
-                    age INTEGER NOT NULL,
-                    experience TEXT NOT NULL,
-                    about TEXT NOT NULL,
-                    photo_id TEXT,
-                    status TEXT DEFAULT 'pending',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users (user_id)
-                )
-            """)
-            
-            # Таблица лайков
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS likes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    client_id INTEGER NOT NULL,
-                    client_username TEXT,
-                    trainer_id INTEGER NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(client_id, trainer_id),
-                    FOREIGN KEY (client_id) REFERENCES users (user_id),
-                    FOREIGN KEY (trainer_id) REFERENCES trainers (id)
-                )
-            """)
-            
-            await db.commit()
+        await self._open_pool()
+        
+        # Схему создаем на соединении для записи, пока очередь записи не запущена.
+        # У воркера соединения для записи нет - схему уже создал супервизор
+        db = await self._writer.open()
+        if db is not None:
+            await self._create_schema(db)
+        
+        self._writer.start()
+    
+    async def _create_schema(self, db: aiosqlite.Connection):
+        """Создать таблицы и применить миграции"""
+        # Таблица пользователей
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                user_id INTEGER PRIMARY KEY,
+                username TEXT,
+                role TEXT
+            )
+        """)
+        
+        # Таблица клиентов с лайками
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS clients (
+                user_id INTEGER PRIMARY KEY,
+                username TEXT,
+                likes_count INTEGER DEFAULT 5,
+                FOREIGN KEY (user_id) REFERENCES users (user_id)
+            )
+        """)
+        
+        # Таблица анкет тренеров
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS trainers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER UNIQUE,
+                username TEXT,
+                direction TEXT NOT NULL,
+                name TEXT NOT NULL,
+                age INTEGER NOT NULL,
+                experience TEXT NOT NULL,
+                about TEXT NOT NULL,
+                photo_id TEXT,
+                status TEXT DEFAULT 'pending',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users (user_id)
+            )
+        """)
+        
+        # Таблица лайков
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS likes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                client_id INTEGER NOT NULL,
+                client_username TEXT,
+                trainer_id INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(client_id, trainer_id),
+                FOREIGN KEY (client_id) REFERENCES users (user_id),
+                FOREIGN KEY (trainer_id) REFERENCES trainers (id)
+            )
+        """)
+        
+        await db.commit()
+        
+        # Доводим схему существующей базы до актуальной версии
+        await apply_migrations(db)
     
     # === Пользователи ===
     
     async def add_user(self, user_id: int, username: Optional[str], role: Optional[str] = None):
         """Добавить или обновить пользователя"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                "INSERT OR REPLACE INTO users (user_id, username, role) VALUES (?, ?, ?)",
-                (user_id, username, role)
-            )
-            await db.commit()
+        await self._execute_write(
+            "INSERT OR REPLACE INTO users (user_id, username, role) VALUES (?, ?, ?)",
+            (user_id, username, role)
+        )
     
+    @retry_on_busy
     async def get_user(self, user_id: int) -> Optional[User]:
         """Получить пользователя по ID"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self.connection() as db:
             async with db.execute(
-                "SELECT * FROM users WHERE user_id = ?", (user_id,)
+                f"SELECT {USER_COLUMNS} FROM users WHERE user_id = ?", (user_id,)
             ) as cursor:
                 row = await cursor.fetchone()
                 if row:
-                    return User(**dict(row))
+                    return User(*row)
                 return None
     
     async def update_user_role(self, user_id: int, role: str):
         """Обновить роль пользователя"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                "UPDATE users SET role = ? WHERE user_id = ?",
-                (role, user_id)
-            )
-            await db.commit()
+        await self._execute_write(
+            "UPDATE users SET role = ? WHERE user_id = ?",
+            (role, user_id)
+        )
     
     # === Клиенты ===
     
     async def create_client(self, user_id: int, username: Optional[str], initial_likes: int = 5):
         """Создать клиента с начальным количеством лайков"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                "INSERT OR REPLACE INTO clients (user_id, username, likes_count) VALUES (?, ?, ?)",
-                (user_id, username, initial_likes)
-            )
-            await db.commit()
+        await self._execute_write(
+            # UPSERT вместо INSERT OR REPLACE: замена строки не вызывает
+            # DELETE-триггеры и сбила бы счетчик клиентов в stats_snapshot
+            """
+            INSERT INTO clients (user_id, username, likes_count) VALUES (?, ?, ?)
+            ON CONFLICT (user_id) DO UPDATE SET
+                username = excluded.username, likes_count = excluded.likes_count
+            """,
+            (user_id, username, initial_likes)
+        )
     
+    @retry_on_busy
     async def get_client(self, user_id: int) -> Optional[Client]:
         """Получить клиента по ID"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self.connection() as db:
             async with db.execute(
-                "SELECT * FROM clients WHERE user_id = ?", (user_id,)
+                f"SELECT {CLIENT_COLUMNS} FROM clients WHERE user_id = ?", (user_id,)
             ) as cursor:
                 row = await cursor.fetchone()
                 if row:
-                    return Client(**dict(row))
+                    return Client(*row)
                 return None
     
     async def get_client_likes(self, user_id: int) -> int:
@@ -128,206 +372,527 @@ class Database:
     
     async def decrease_client_likes(self, user_id: int, amount: int = 1) -> bool:
         """Уменьшить количество лайков клиента. Возвращает True если успешно"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Проверяем, достаточно ли лайков
-            async with db.execute(
-                "SELECT likes_count FROM clients WHERE user_id = ?", (user_id,)
-            ) as cursor:
-                row = await cursor.fetchone()
-                if not row or row[0] < amount:
-                    return False
-            
-            # Уменьшаем
-            await db.execute(
-                "UPDATE clients SET likes_count = likes_count - ? WHERE user_id = ?",
-                (amount, user_id)
-            )
-            await db.commit()
-            return True
+        return await self.write(BoundWrite(self._decrease_client_likes, user_id, amount))
+    
+    @staticmethod
+    async def _decrease_client_likes(db: aiosqlite.Connection, user_id: int, amount: int) -> bool:
+        # Проверка и списание в одной транзакции записи
+        cursor = await db.execute(
+            "UPDATE clients SET likes_count = likes_count - ? WHERE user_id = ? AND likes_count >= ?",
+            (amount, user_id, amount)
+        )
+        return cursor.rowcount > 0
     
     async def add_client_likes(self, user_id: int, amount: int):
         """Добавить лайки клиенту"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Если клиента нет, создаем с указанным количеством
-            await db.execute(
-                "INSERT INTO clients (user_id, likes_count) VALUES (?, ?) "
-                "ON CONFLICT(user_id) DO UPDATE SET likes_count = likes_count + ?",
-                (user_id, amount, amount)
-            )
-            await db.commit()
+        # Если клиента нет, создаем с указанным количеством
+        await self._execute_write(
+            "INSERT INTO clients (user_id, likes_count) VALUES (?, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET likes_count = likes_count + ?",
+            (user_id, amount, amount)
+        )
     
+    @retry_on_busy
     async def get_client_by_username(self, username: str) -> Optional[Client]:
         """Получить клиента по username"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self.connection() as db:
             async with db.execute(
-                "SELECT * FROM clients WHERE username = ?", (username,)
+                f"SELECT {CLIENT_COLUMNS} FROM clients WHERE username = ?", (username,)
             ) as cursor:
                 row = await cursor.fetchone()
                 if row:
-                    return Client(**dict(row))
+                    return Client(*row)
                 return None
     
     # === Тренеры ===
     
     async def create_trainer(self, trainer: Trainer) -> int:
         """Создать или обновить анкету тренера"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Проверяем, есть ли уже анкета у этого пользователя
-            async with db.execute(
-                "SELECT id FROM trainers WHERE user_id = ?", (trainer.user_id,)
-            ) as cursor:
-                existing = await cursor.fetchone()
-            
-            if existing:
-                # Обновляем существующую анкету
-                trainer_id = existing[0]
-                await db.execute("""
-                    UPDATE trainers 
-                    SET username = ?, direction = ?, name = ?, age = ?, 
-                        experience = ?, about = ?, photo_id = ?, status = ?
-                    WHERE user_id = ?
-                """, (
-                    trainer.username, trainer.direction, trainer.name, 
-                    trainer.age, trainer.experience, trainer.about, 
-                    trainer.photo_id, trainer.status, trainer.user_id
-                ))
-                await db.commit()
-                return trainer_id
-            else:
-                # Создаем новую анкету
-                cursor = await db.execute("""
-                    INSERT INTO trainers 
-                    (user_id, username, direction, name, age, experience, about, photo_id, status)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    trainer.user_id, trainer.username, trainer.direction,
-                    trainer.name, trainer.age, trainer.experience,
-                    trainer.about, trainer.photo_id, trainer.status
-                ))
-                await db.commit()
-                return cursor.lastrowid
+        trainer_id = await self.write(BoundWrite(self._create_trainer, trainer))
+        self.invalidate_trainer(trainer_id)
+        self._invalidate_snapshots()
+        return trainer_id
+    
+    @staticmethod
+    async def _create_trainer(db: aiosqlite.Connection, trainer: Trainer) -> int:
+        # Проверяем, есть ли уже анкета у этого пользователя
+        async with db.execute(
+            "SELECT id FROM trainers WHERE user_id = ?", (trainer.user_id,)
+        ) as cursor:
+            existing = await cursor.fetchone()
+        
+        if existing:
+            # Обновляем существующую анкету
+            await db.execute("""
+                UPDATE trainers 
+                SET username = ?, direction = ?, name = ?, age = ?, 
+                    experience = ?, about = ?, photo_id = ?, status = ?,
+                    version = version + 1
+                WHERE user_id = ?
+            """, (
+                trainer.username, trainer.direction, trainer.name, 
+                trainer.age, trainer.experience, trainer.about, 
+                trainer.photo_id, trainer.status, trainer.user_id
+            ))
+            return existing[0]
+        else:
+            # Создаем новую анкету
+            cursor = await db.execute("""
+                INSERT INTO trainers 
+                (user_id, username, direction, name, age, experience, about, photo_id, status)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                trainer.user_id, trainer.username, trainer.direction,
+                trainer.name, trainer.age, trainer.experience,
+                trainer.about, trainer.photo_id, trainer.status
+            ))
+            return cursor.lastrowid
     
+    @retry_on_busy
     async def get_trainer_by_user_id(self, user_id: int) -> Optional[Trainer]:
         """Получить анкету тренера по user_id"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self.connection() as db:
             async with db.execute(
-                "SELECT * FROM trainers WHERE user_id = ?", (user_id,)
+                f"SELECT {TRAINER_COLUMNS} FROM trainers WHERE user_id = ?", (user_id,)
             ) as cursor:
                 row = await cursor.fetchone()
                 if row:
-                    return Trainer(**dict(row))
+                    return Trainer(*row)
                 return None
     
+    @retry_on_busy
     async def get_trainer_by_id(self, trainer_id: int) -> Optional[Trainer]:
-        """Получить анкету тренера по ID"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        """Получить анкету тренера по ID (через кэш)"""
+        trainer = self._trainer_cache.get(trainer_id)
+        if trainer is not None:
+            return trainer
+        
+        generation = self._trainer_cache_generation
+        async with self.connection() as db:
             async with db.execute(
-                "SELECT * FROM trainers WHERE id = ?", (trainer_id,)
+                f"SELECT {TRAINER_COLUMNS} FROM trainers WHERE id = ?", (trainer_id,)
             ) as cursor:
                 row = await cursor.fetchone()
-                if row:
-                    return Trainer(**dict(row))
-                return None
+        
+        if not row:
+            return None
+        trainer = Trainer(*row)
+        if generation == self._trainer_cache_generation:
+            self._trainer_cache.set(trainer_id, trainer)
+        return trainer
     
-    async def get_pending_trainers(self) -> List[Trainer]:
-        """Получить анкеты тренеров на модерации"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            async with db.execute(
-                "SELECT * FROM trainers WHERE status = 'pending' ORDER BY created_at"
-            ) as cursor:
+    @retry_on_busy
+    async def get_pending_trainers(
+        self,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        before_id: Optional[int] = None
+    ) -> List[Trainer]:
+        """
+        Получить анкеты тренеров на модерации в порядке поступления
+        
+        Постранично по ключу: after_id - анкеты после указанной,
+        before_id - ближайшие анкеты перед указанной (тоже по возрастанию).
+        """
+        query = f"SELECT {TRAINER_COLUMNS} FROM trainers WHERE status = 'pending'"
+        params = []
+        if after_id is not None:
+            query += " AND id > ?"
+            params.append(after_id)
+        if before_id is not None:
+            query += " AND id < ?"
+            params.append(before_id)
+        # Назад идем от ближайшей анкеты, а результат разворачиваем
+        query += " ORDER BY id DESC" if before_id is not None else " ORDER BY id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        async with self.connection() as db:
+            async with db.execute(query, params) as cursor:
                 rows = await cursor.fetchall()
-                return [Trainer(**dict(row)) for row in rows]
+        trainers = [Trainer(*row) for row in rows]
+        if before_id is not None:
+            trainers.reverse()
+        return trainers
+    
+    async def count_pending_trainers(self) -> int:
+        """Количество анкет на модерации"""
+        stats = await self.get_stats()
+        return stats.trainers_with_status('pending')
     
+    @retry_on_busy
     async def get_approved_trainers_by_direction(self, direction: str) -> List[Trainer]:
         """Получить одобренных тренеров по направлению"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self.connection() as db:
             async with db.execute(
-                "SELECT * FROM trainers WHERE status = 'approved' AND direction = ? ORDER BY created_at DESC",
+                f"SELECT {TRAINER_COLUMNS} FROM trainers WHERE status = 'approved' AND direction = ? ORDER BY created_at DESC",
                 (direction,)
             ) as cursor:
                 rows = await cursor.fetchall()
-                return [Trainer(**dict(row)) for row in rows]
+                return [Trainer(*row) for row in rows]
+    
+    @retry_on_busy
+    async def get_direction_snapshot(self, direction: str) -> DirectionSnapshot:
+        """Снимок ID одобренных анкет направления (общий для всех клиентов)"""
+        snapshot = self._snapshots.get(direction)
+        if snapshot is not None:
+            return snapshot
+        
+        version = self._snapshot_version
+        async with self.connection() as db:
+            async with db.execute(
+                "SELECT id FROM trainers WHERE status = 'approved' AND direction = ? ORDER BY created_at DESC",
+                (direction,)
+            ) as cursor:
+                trainer_ids = tuple(row[0] for row in await cursor.fetchall())
+        
+        snapshot = DirectionSnapshot(direction=direction, version=version, trainer_ids=trainer_ids)
+        # Если за время запроса набор анкет изменился, снимок не сохраняем
+        if version == self._snapshot_version:
+            self._snapshots[direction] = snapshot
+        return snapshot
     
+    @retry_on_busy
+    async def get_approved_trainers_page(
+        self,
+        direction: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 10,
+        before: Optional[str] = None
+    ) -> Page[Trainer]:
+        """
+        Страница одобренных анкет (новые первыми), все или одного направления
+        
+        Постранично по ключу: cursor - анкеты после указанной,
+        before - ближайшие анкеты перед указанной (тоже новые первыми).
+        """
+        query = f"SELECT {TRAINER_COLUMNS} FROM trainers WHERE status = 'approved'"
+        params = []
+        if direction is not None:
+            query += " AND direction = ?"
+            params.append(direction)
+        if cursor is not None:
+            query += " AND (created_at, id) < (?, ?)"
+            params.extend(decode_cursor(cursor))
+        if before is not None:
+            query += " AND (created_at, id) > (?, ?)"
+            params.extend(decode_cursor(before))
+        # Назад идем от ближайшей анкеты, а результат разворачиваем.
+        # Лишняя строка показывает, есть ли еще страница в ту же сторону
+        order = "ASC" if before is not None else "DESC"
+        query += f" ORDER BY created_at {order}, id {order} LIMIT ?"
+        params.append(limit + 1)
+        
+        async with self.connection() as db:
+            async with db.execute(query, params) as result:
+                rows = await result.fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if before is not None:
+            rows.reverse()
+        trainers = [Trainer(*row) for row in rows]
+        if not trainers:
+            return Page(items=trainers, next_cursor=None)
+        
+        first, last = trainers[0], trainers[-1]
+        if before is not None:
+            # Страница, с которой пришли, лежит дальше
+            next_cursor = encode_cursor(last.created_at, last.id)
+            prev_cursor = encode_cursor(first.created_at, first.id) if has_more else None
+        else:
+            next_cursor = encode_cursor(last.created_at, last.id) if has_more else None
+            prev_cursor = encode_cursor(first.created_at, first.id) if cursor is not None else None
+        return Page(items=trainers, next_cursor=next_cursor, prev_cursor=prev_cursor)
+    
+    @retry_on_busy
+    async def get_stats(self) -> StatsSnapshot:
+        """Сводная статистика: одна выборка из маленькой таблицы, обновляемой триггерами"""
+        trainers = {}
+        totals = {}
+        async with self.connection() as db:
+            async with db.execute("SELECT metric, status, direction, value FROM stats_snapshot") as cursor:
+                for metric, status, direction, value in await cursor.fetchall():
+                    if metric == 'trainers':
+                        trainers[(status, direction)] = value
+                    else:
+                        totals[metric] = value
+        return StatsSnapshot(
+            trainers=trainers,
+            likes=totals.get('likes', 0),
+            clients=totals.get('clients', 0),
+            active_clients=totals.get('active_clients', 0)
+        )
+    
+    async def count_approved_trainers_by_direction(self) -> Dict[str, int]:
+        """Количество одобренных анкет по направлениям"""
+        stats = await self.get_stats()
+        return stats.trainers_by_direction('approved')
+    
+    @retry_on_busy
     async def get_all_approved_trainers(self) -> List[Trainer]:
         """Получить всех одобренных тренеров"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self.connection() as db:
             async with db.execute(
-                "SELECT * FROM trainers WHERE status = 'approved' ORDER BY direction, created_at DESC"
+                f"SELECT {TRAINER_COLUMNS} FROM trainers WHERE status = 'approved' ORDER BY direction, created_at DESC"
             ) as cursor:
                 rows = await cursor.fetchall()
-                return [Trainer(**dict(row)) for row in rows]
+                return [Trainer(*row) for row in rows]
     
     async def update_trainer_status(self, trainer_id: int, status: str):
         """Обновить статус анкеты тренера"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                "UPDATE trainers SET status = ? WHERE id = ?",
-                (status, trainer_id)
-            )
-            await db.commit()
+        await self._execute_write(
+            "UPDATE trainers SET status = ?, version = version + 1 WHERE id = ?",
+            (status, trainer_id)
+        )
+        self.invalidate_trainer(trainer_id)
+        self._invalidate_snapshots()
     
     async def delete_trainer(self, trainer_id: int):
         """Удалить анкету тренера"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Сначала удаляем связанные лайки
-            await db.execute("DELETE FROM likes WHERE trainer_id = ?", (trainer_id,))
-            # Затем удаляем тренера
-            await db.execute("DELETE FROM trainers WHERE id = ?", (trainer_id,))
-            await db.commit()
+        await self.write(BoundWrite(self._delete_trainer, trainer_id))
+        self.invalidate_trainer(trainer_id)
+        self._invalidate_snapshots()
+        self._forget_trainer_likes(trainer_id)
+    
+    @staticmethod
+    async def _delete_trainer(db: aiosqlite.Connection, trainer_id: int):
+        # Сначала удаляем связанные лайки
+        await db.execute("DELETE FROM likes WHERE trainer_id = ?", (trainer_id,))
+        # Затем удаляем тренера
+        await db.execute("DELETE FROM trainers WHERE id = ?", (trainer_id,))
     
     # === Лайки ===
     
     async def add_like(self, client_id: int, client_username: Optional[str], trainer_id: int):
         """Добавить лайк"""
-        async with aiosqlite.connect(self.db_path) as db:
-            try:
-                await db.execute(
-                    "INSERT INTO likes (client_id, client_username, trainer_id) VALUES (?, ?, ?)",
-                    (client_id, client_username, trainer_id)
-                )
-                await db.commit()
-                return True
-            except aiosqlite.IntegrityError:
-                # Лайк уже существует
-                return False
+        try:
+            await self._execute_write(
+                "INSERT INTO likes (client_id, client_username, trainer_id) VALUES (?, ?, ?)",
+                (client_id, client_username, trainer_id)
+            )
+        except aiosqlite.IntegrityError:
+            # Лайк уже существует
+            return False
+        # Триггер изменил likes_count у тренера
+        self.invalidate_trainer(trainer_id)
+        self._remember_like(client_id, trainer_id)
+        return True
+    
+    async def spend_like(
+        self,
+        client_id: int,
+        client_username: Optional[str],
+        trainer_id: int,
+        notification: Optional[str] = None
+    ) -> LikeResult:
+        """
+        Списать лайк и записать его тренеру одной транзакцией
+        
+        Если передан текст notification, уведомление тренеру кладется в outbox
+        в той же транзакции и отправляется фоновым обработчиком.
+        """
+        result = await self.write(BoundWrite(self._spend_like, client_id, client_username, trainer_id, notification))
+        if result.status == 'already_liked':
+            self._remember_like(client_id, trainer_id)
+        if result.status != 'ok':
+            return result
+        
+        # Триггер изменил likes_count у тренера
+        self.invalidate_trainer(trainer_id)
+        self._remember_like(client_id, trainer_id)
+        if notification:
+            self._notify_outbox()
+        return result
+    
+    @staticmethod
+    async def _spend_like(
+        db: aiosqlite.Connection,
+        client_id: int,
+        client_username: Optional[str],
+        trainer_id: int,
+        notification: Optional[str]
+    ) -> LikeResult:
+        # Транзакция записи начинается с BEGIN IMMEDIATE, поэтому параллельные
+        # нажатия не могут потратить один и тот же лайк дважды
+        async with db.execute("""
+            SELECT
+                (SELECT likes_count FROM clients WHERE user_id = ?),
+                (SELECT user_id FROM trainers WHERE id = ?),
+                EXISTS(SELECT 1 FROM likes WHERE client_id = ? AND trainer_id = ?)
+        """, (client_id, trainer_id, client_id, trainer_id)) as cursor:
+            likes_count, trainer_user_id, already_liked = await cursor.fetchone()
+        
+        likes_count = likes_count or 0
+        if trainer_user_id is None:
+            return LikeResult(status='not_found', likes_left=likes_count)
+        if already_liked:
+            return LikeResult(status='already_liked', likes_left=likes_count, trainer_user_id=trainer_user_id)
+        if likes_count < 1:
+            return LikeResult(status='no_likes', likes_left=likes_count, trainer_user_id=trainer_user_id)
+        
+        await db.execute(
+            "UPDATE clients SET likes_count = likes_count - 1 WHERE user_id = ?",
+            (client_id,)
+        )
+        await db.execute(
+            "INSERT INTO likes (client_id, client_username, trainer_id) VALUES (?, ?, ?)",
+            (client_id, client_username, trainer_id)
+        )
+        if notification:
+            await Database._enqueue_outbox(db, trainer_user_id, notification)
+        return LikeResult(status='ok', likes_left=likes_count - 1, trainer_user_id=trainer_user_id)
+    
+    @staticmethod
+    async def _enqueue_outbox(db: aiosqlite.Connection, chat_id: int, text: str):
+        """Положить уведомление в outbox в рамках текущей транзакции"""
+        await db.execute(
+            "INSERT INTO outbox (chat_id, text, next_attempt_at) VALUES (?, ?, ?)",
+            (chat_id, text, time.time())
+        )
+    
+    @retry_on_busy
+    async def get_due_outbox(self, limit: int = 50) -> List[OutboxMessage]:
+        """Уведомления, которые пора отправить (старые первыми)"""
+        async with self.connection() as db:
+            async with db.execute(f"""
+                SELECT {OUTBOX_COLUMNS} FROM outbox
+                WHERE status = 'pending' AND next_attempt_at <= ?
+                ORDER BY next_attempt_at, id
+                LIMIT ?
+            """, (time.time(), limit)) as cursor:
+                rows = await cursor.fetchall()
+                return [OutboxMessage(*row) for row in rows]
     
+    @retry_on_busy
+    async def get_next_outbox_time(self) -> Optional[float]:
+        """Время ближайшей запланированной попытки отправки"""
+        async with self.connection() as db:
+            async with db.execute(
+                "SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'"
+            ) as cursor:
+                row = await cursor.fetchone()
+                return row[0]
+    
+    async def delete_outbox(self, message_id: int):
+        """Удалить отправленное уведомление"""
+        await self._execute_write("DELETE FROM outbox WHERE id = ?", (message_id,))
+    
+    async def reschedule_outbox(self, message_id: int, next_attempt_at: float, error: str):
+        """Отложить уведомление до следующей попытки"""
+        await self._execute_write(
+            "UPDATE outbox SET attempts = attempts + 1, next_attempt_at = ?, last_error = ? WHERE id = ?",
+            (next_attempt_at, error, message_id)
+        )
+    
+    async def fail_outbox(self, message_id: int, error: str):
+        """Прекратить попытки: уведомление остается в таблице со статусом failed"""
+        await self._execute_write(
+            "UPDATE outbox SET status = 'failed', attempts = attempts + 1, last_error = ? WHERE id = ?",
+            (error, message_id)
+        )
+    
+    @retry_on_busy
     async def get_trainer_likes(self, trainer_id: int) -> List[Like]:
         """Получить все лайки для тренера"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self.connection() as db:
             async with db.execute(
-                "SELECT * FROM likes WHERE trainer_id = ? ORDER BY created_at DESC",
+                f"SELECT {LIKE_COLUMNS} FROM likes WHERE trainer_id = ? ORDER BY created_at DESC",
                 (trainer_id,)
             ) as cursor:
                 rows = await cursor.fetchall()
-                return [Like(**dict(row)) for row in rows]
+                return [Like(*row) for row in rows]
     
-    async def check_like_exists(self, client_id: int, trainer_id: int) -> bool:
-        """Проверить, есть ли уже лайк"""
-        async with aiosqlite.connect(self.db_path) as db:
+    @retry_on_busy
+    async def get_trainer_likes_page(
+        self,
+        trainer_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 20
+    ) -> Page[Like]:
+        """Страница лайков тренера (новые первыми)"""
+        query = f"SELECT {LIKE_COLUMNS} FROM likes WHERE trainer_id = ?"
+        params = [trainer_id]
+        if cursor is not None:
+            query += " AND (created_at, id) < (?, ?)"
+            params.extend(decode_cursor(cursor))
+        query += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+        
+        async with self.connection() as db:
+            async with db.execute(query, params) as result:
+                rows = await result.fetchall()
+        likes = [Like(*row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = likes[-1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        return Page(items=likes, next_cursor=next_cursor)
+    
+    async def get_client_liked_ids(self, client_id: int) -> FrozenSet[int]:
+        """Множество ID тренеров, лайкнутых клиентом (загружается один раз)"""
+        # Копия: изменения вызывающего не должны попасть в кэш
+        return frozenset(await self._load_liked_ids(client_id))
+    
+    @retry_on_busy
+    async def _load_liked_ids(self, client_id: int) -> Set[int]:
+        """Закэшированное множество клиента; меняют его только _remember_like и _drop_trainer_likes"""
+        liked = self._liked_cache.get(client_id)
+        if liked is not None:
+            return liked
+        
+        generation = self._liked_cache_generation
+        async with self.connection() as db:
             async with db.execute(
-                "SELECT 1 FROM likes WHERE client_id = ? AND trainer_id = ?",
-                (client_id, trainer_id)
+                "SELECT trainer_id FROM likes WHERE client_id = ?", (client_id,)
             ) as cursor:
-                row = await cursor.fetchone()
-                return row is not None
+                liked = {row[0] for row in await cursor.fetchall()}
+        
+        # Если пока шла загрузка появились новые лайки, не кэшируем снимок
+        if generation == self._liked_cache_generation:
+            self._liked_cache.set(client_id, liked)
+        return liked
     
+    async def check_like_exists(self, client_id: int, trainer_id: int) -> bool:
+        """Проверить, есть ли уже лайк"""
+        liked = await self._load_liked_ids(client_id)
+        return trainer_id in liked
+    
+    @retry_on_busy
     async def get_client_liked_trainers(self, client_id: int) -> List[Trainer]:
         """Получить список тренеров, которых лайкнул клиент"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            async with db.execute("""
-                SELECT t.* FROM trainers t
+        async with self.connection() as db:
+            async with db.execute(f"""
+                SELECT {TRAINER_T_COLUMNS} FROM trainers t
                 INNER JOIN likes l ON t.id = l.trainer_id
                 WHERE l.client_id = ? AND t.status = 'approved'
                 ORDER BY l.created_at DESC
             """, (client_id,)) as cursor:
                 rows = await cursor.fetchall()
-                return [Trainer(**dict(row)) for row in rows]
+                return [Trainer(*row) for row in rows]
+    
+    @retry_on_busy
+    async def get_client_liked_trainers_page(self, client_id: int, page: int, per_page: int = 5) -> List[LikedTrainer]:
+        """Страница лайкнутых клиентом тренеров (последние лайки первыми)"""
+        async with self.connection() as db:
+            async with db.execute("""
+                SELECT t.id, t.name, t.direction FROM likes l
+                INNER JOIN trainers t ON t.id = l.trainer_id
+                WHERE l.client_id = ? AND t.status = 'approved'
+                ORDER BY l.created_at DESC, l.id DESC
+                LIMIT ? OFFSET ?
+            """, (client_id, per_page, page * per_page)) as cursor:
+                return [LikedTrainer(*row) for row in await cursor.fetchall()]
+    
+    @retry_on_busy
+    async def count_client_liked_trainers(self, client_id: int) -> int:
+        """Количество лайкнутых клиентом одобренных тренеров"""
+        async with self.connection() as db:
+            async with db.execute("""
+                SELECT COUNT(*) FROM likes l
+                INNER JOIN trainers t ON t.id = l.trainer_id
+                WHERE l.client_id = ? AND t.status = 'approved'
+            """, (client_id,)) as cursor:
+                row = await cursor.fetchone()
+                return row[0]
 
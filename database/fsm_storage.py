@@ -0,0 +1,226 @@
+"""Постоянное FSM-хранилище в SQLite"""
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, KeyBuilder, StateType, StorageKey
+
+from .cache import LRUCache
+from .database import Database
+from .writer import BoundWrite
+from .retry import is_retryable_read
+
+logger = logging.getLogger(__name__)
+
+# Группа сессий без состояния: просмотр анкет и списка лайков клиентом
+BROWSE_GROUP = "browse"
+
+# Событие для других процессов: сессии удалены из таблицы (аргумент - список ключей)
+EVICTED_EVENT = "fsm_evicted"
+
+
+class _SessionRecord:
+    """Состояние и данные одной FSM-сессии"""
+    __slots__ = ("state", "data")
+    
+    def __init__(self, state: Optional[str] = None, data: Optional[Dict[str, Any]] = None):
+        self.state = state
+        self.data = data if data is not None else {}
+    
+    @property
+    def is_empty(self) -> bool:
+        return self.state is None and not self.data
+
+
+class SQLiteStorage(BaseStorage):
+    """
+    FSM-хранилище в файле базы данных бота
+    
+    Горячие сессии держатся в ограниченном LRU-кэше, изменения копятся
+    в памяти и записываются в таблицу fsm_sessions одной транзакцией
+    не чаще раза в flush_interval секунд. Пустые сессии удаляются из таблицы.
+    """
+    
+    def __init__(
+        self,
+        db: Database,
+        cache_size: int = 10000,
+        flush_interval: float = 1.0,
+        key_builder: Optional[KeyBuilder] = None
+    ):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.key_builder = key_builder or DefaultKeyBuilder(with_bot_id=True, with_destiny=True)
+        self._cache = LRUCache(cache_size)
+        # Измененные, но еще не записанные сессии
+        self._dirty: Dict[str, _SessionRecord] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        # Сессии удаляет очистка в другом процессе - сбрасываем их из своего кэша
+        db.add_change_handler(EVICTED_EVENT, self._forget)
+    
+    async def _load(self, key: StorageKey) -> tuple:
+        """Найти сессию: сначала в несохраненных, затем в кэше, затем в БД"""
+        storage_key = self.key_builder.build(key)
+        
+        record = self._dirty.get(storage_key)
+        if record is None:
+            record = self._cache.get(storage_key)
+        if record is None:
+            row = await self.db.retry.run(lambda: self._select(storage_key), is_retryable_read)
+            # Пока шел запрос, сессию могли изменить - берем более свежую версию
+            record = self._dirty.get(storage_key) or self._cache.peek(storage_key)
+            if record is None:
+                record = _SessionRecord(row[0], json.loads(row[1])) if row else _SessionRecord()
+            self._cache.set(storage_key, record)
+        
+        return storage_key, record
+    
+    async def _select(self, storage_key: str) -> Optional[tuple]:
+        async with self.db.connection() as db:
+            async with db.execute(
+                "SELECT state, data FROM fsm_sessions WHERE key = ?", (storage_key,)
+            ) as cursor:
+                return await cursor.fetchone()
+    
+    def _mark_dirty(self, storage_key: str, record: _SessionRecord):
+        """Запланировать запись сессии"""
+        self._dirty[storage_key] = record
+        self._cache.set(storage_key, record)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+    
+    async def _delayed_flush(self):
+        """Подождать, пока накопятся изменения, и записать их одним пакетом"""
+        await asyncio.sleep(self.flush_interval)
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"❌ Не удалось сохранить FSM-сессии: {e}")
+            # Повторим попытку при следующем изменении или закрытии
+    
+    async def flush(self):
+        """Записать все накопленные изменения одной транзакцией"""
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+            
+            dirty, self._dirty = self._dirty, {}
+            now = time.time()
+            upserts = []
+            deletes = []
+            for storage_key, record in dirty.items():
+                if record.is_empty:
+                    deletes.append((storage_key,))
+                else:
+                    upserts.append((
+                        storage_key,
+                        record.state,
+                        json.dumps(record.data, ensure_ascii=False, separators=(",", ":")),
+                        now
+                    ))
+            
+            try:
+                await self.db.write(BoundWrite(self._write_sessions, upserts, deletes))
+            except BaseException:
+                # Возвращаем несохраненное, не затирая более свежие изменения
+                for storage_key, record in dirty.items():
+                    self._dirty.setdefault(storage_key, record)
+                raise
+    
+    @staticmethod
+    async def _write_sessions(db, upserts: list, deletes: list):
+        if upserts:
+            await db.executemany(
+                "INSERT INTO fsm_sessions (key, state, data, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET state = excluded.state, "
+                "data = excluded.data, updated_at = excluded.updated_at",
+                upserts
+            )
+        if deletes:
+            await db.executemany("DELETE FROM fsm_sessions WHERE key = ?", deletes)
+    
+    async def evict_idle(self, ttls: Dict[str, float]) -> Tuple[int, int]:
+        """
+        Удалить сессии, не менявшиеся дольше TTL своей группы
+        
+        Args:
+            ttls: TTL в секундах по группам: BROWSE_GROUP для сессий без состояния,
+                  имя StatesGroup (например, "TrainerRegistration") для остальных
+        
+        Returns:
+            Количество удаленных сессий и освобожденный объем в байтах
+        """
+        # Сначала сохраняем накопленное, чтобы updated_at был актуальным
+        await self.flush()
+        
+        async with self._flush_lock:
+            removed = await self.db.write(BoundWrite(self._delete_idle, ttls, time.time()))
+            keys = [row[0] for row in removed]
+            self._forget(keys)
+        # Воркеры держат свои сессии в кэше - им тоже нужно их забыть
+        if keys:
+            self.db.publish(EVICTED_EVENT, keys)
+        
+        return len(removed), sum(row[1] for row in removed)
+    
+    @staticmethod
+    async def _delete_idle(db, ttls: Dict[str, float], now: float) -> list:
+        removed = []
+        for group, ttl in ttls.items():
+            if group == BROWSE_GROUP:
+                condition, params = "state IS NULL", ()
+            else:
+                condition, params = "state LIKE ?", (f"{group}:%",)
+            deadline = now - ttl
+            
+            async with db.execute(
+                "SELECT key, LENGTH(CAST(key AS BLOB)) + IFNULL(LENGTH(CAST(state AS BLOB)), 0) "
+                f"+ LENGTH(CAST(data AS BLOB)) FROM fsm_sessions WHERE {condition} AND updated_at < ?",
+                (*params, deadline)
+            ) as cursor:
+                stale = await cursor.fetchall()
+            if not stale:
+                continue
+            
+            await db.executemany(
+                "DELETE FROM fsm_sessions WHERE key = ? AND updated_at < ?",
+                [(row[0], deadline) for row in stale]
+            )
+            removed.extend(stale)
+        return removed
+    
+    def _forget(self, keys: List[str]):
+        """Убрать удаленные из таблицы сессии из кэша"""
+        for storage_key in keys:
+            # Сессии, измененные уже после выборки, не трогаем
+            if storage_key not in self._dirty:
+                self._cache.pop(storage_key)
+    
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        storage_key, record = await self._load(key)
+        record.state = state.state if isinstance(state, State) else state
+        self._mark_dirty(storage_key, record)
+    
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        _, record = await self._load(key)
+        return record.state
+    
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        storage_key, record = await self._load(key)
+        record.data = data.copy()
+        self._mark_dirty(storage_key, record)
+    
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        _, record = await self._load(key)
+        return record.data.copy()
+    
+    async def close(self) -> None:
+        """Дописать накопленные изменения перед остановкой"""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._flush_task = None
+        await self.flush()
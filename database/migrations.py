@@ -0,0 +1,248 @@
+"""Версионные миграции схемы базы данных"""
+import logging
+from dataclasses import dataclass
+from typing import Tuple
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """Шаг миграции схемы"""
+    version: int
+    description: str
+    statements: Tuple[str, ...]
+
+
+# Шаги применяются строго по возрастанию версии, уже примененные пропускаются.
+# Существующие шаги не редактируются - любое изменение схемы оформляется новым шагом.
+MIGRATIONS: Tuple[Migration, ...] = (
+    Migration(
+        version=1,
+        description="Индексы для горячих запросов",
+        statements=(
+            # get_approved_trainers_by_direction, get_all_approved_trainers
+            "CREATE INDEX IF NOT EXISTS idx_trainers_status_direction_created "
+            "ON trainers (status, direction, created_at)",
+            # get_trainer_likes
+            "CREATE INDEX IF NOT EXISTS idx_likes_trainer_created "
+            "ON likes (trainer_id, created_at)",
+            # get_client_liked_trainers
+            "CREATE INDEX IF NOT EXISTS idx_likes_client_created "
+            "ON likes (client_id, created_at)",
+            # get_client_by_username
+            "CREATE INDEX IF NOT EXISTS idx_clients_username "
+            "ON clients (username)",
+        ),
+    ),
+    Migration(
+        version=2,
+        description="Счетчик лайков тренера, поддерживаемый триггерами",
+        statements=(
+            "ALTER TABLE trainers ADD COLUMN likes_count INTEGER NOT NULL DEFAULT 0",
+            # Заполняем счетчик по уже существующим лайкам
+            "UPDATE trainers SET likes_count = "
+            "(SELECT COUNT(*) FROM likes WHERE likes.trainer_id = trainers.id)",
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_likes_after_insert
+            AFTER INSERT ON likes
+            BEGIN
+                UPDATE trainers SET likes_count = likes_count + 1 WHERE id = NEW.trainer_id;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_likes_after_delete
+            AFTER DELETE ON likes
+            BEGIN
+                UPDATE trainers SET likes_count = likes_count - 1 WHERE id = OLD.trainer_id;
+            END
+            """,
+        ),
+    ),
+    Migration(
+        version=3,
+        description="Таблица FSM-сессий",
+        statements=(
+            """
+            CREATE TABLE IF NOT EXISTS fsm_sessions (
+                key TEXT PRIMARY KEY,
+                state TEXT,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            ) WITHOUT ROWID
+            """,
+        ),
+    ),
+    Migration(
+        version=4,
+        description="Версия анкеты тренера для кэша отрисованных карточек",
+        statements=(
+            "ALTER TABLE trainers ADD COLUMN version INTEGER NOT NULL DEFAULT 1",
+        ),
+    ),
+    Migration(
+        version=5,
+        description="Очередь исходящих уведомлений (outbox)",
+        statements=(
+            """
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                chat_id INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                last_error TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_outbox_status_next ON outbox(status, next_attempt_at)",
+        ),
+    ),
+    Migration(
+        version=6,
+        description="Индекс для постраничного списка всех анкет по статусу",
+        statements=(
+            # get_approved_trainers_page без направления. Очередь модерации
+            # (get_pending_trainers) сортируется по id, и этот индекс дает ей
+            # только отбор по status
+            "CREATE INDEX IF NOT EXISTS idx_trainers_status_created "
+            "ON trainers (status, created_at)",
+        ),
+    ),
+    Migration(
+        version=7,
+        description="Сводная статистика, поддерживаемая триггерами",
+        statements=(
+            # metric: 'trainers' (по статусу и направлению), 'likes', 'clients',
+            # 'active_clients' (клиенты хотя бы с одним лайком)
+            """
+            CREATE TABLE IF NOT EXISTS stats_snapshot (
+                metric TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT '',
+                direction TEXT NOT NULL DEFAULT '',
+                value INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (metric, status, direction)
+            ) WITHOUT ROWID
+            """,
+            # Заполняем по уже существующим данным
+            "INSERT INTO stats_snapshot (metric, status, direction, value) "
+            "SELECT 'trainers', COALESCE(status, ''), direction, COUNT(*) FROM trainers "
+            "GROUP BY COALESCE(status, ''), direction",
+            "INSERT INTO stats_snapshot (metric, value) SELECT 'likes', COUNT(*) FROM likes",
+            "INSERT INTO stats_snapshot (metric, value) SELECT 'clients', COUNT(*) FROM clients",
+            "INSERT INTO stats_snapshot (metric, value) "
+            "SELECT 'active_clients', COUNT(DISTINCT client_id) FROM likes",
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_stats_trainers_insert
+            AFTER INSERT ON trainers
+            BEGIN
+                INSERT INTO stats_snapshot (metric, status, direction, value)
+                VALUES ('trainers', COALESCE(NEW.status, ''), NEW.direction, 1)
+                ON CONFLICT (metric, status, direction) DO UPDATE SET value = value + 1;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_stats_trainers_delete
+            AFTER DELETE ON trainers
+            BEGIN
+                UPDATE stats_snapshot SET value = value - 1
+                WHERE metric = 'trainers' AND status = COALESCE(OLD.status, '') AND direction = OLD.direction;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_stats_trainers_update
+            AFTER UPDATE OF status, direction ON trainers
+            WHEN OLD.status IS NOT NEW.status OR OLD.direction IS NOT NEW.direction
+            BEGIN
+                UPDATE stats_snapshot SET value = value - 1
+                WHERE metric = 'trainers' AND status = COALESCE(OLD.status, '') AND direction = OLD.direction;
+                INSERT INTO stats_snapshot (metric, status, direction, value)
+                VALUES ('trainers', COALESCE(NEW.status, ''), NEW.direction, 1)
+                ON CONFLICT (metric, status, direction) DO UPDATE SET value = value + 1;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_stats_likes_insert
+            AFTER INSERT ON likes
+            BEGIN
+                UPDATE stats_snapshot SET value = value + 1 WHERE metric = 'likes';
+                UPDATE stats_snapshot SET value = value + 1
+                WHERE metric = 'active_clients'
+                  AND NOT EXISTS (SELECT 1 FROM likes WHERE client_id = NEW.client_id AND id != NEW.id);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_stats_likes_delete
+            AFTER DELETE ON likes
+            BEGIN
+                UPDATE stats_snapshot SET value = value - 1 WHERE metric = 'likes';
+                UPDATE stats_snapshot SET value = value - 1
+                WHERE metric = 'active_clients'
+                  AND NOT EXISTS (SELECT 1 FROM likes WHERE client_id = OLD.client_id);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_stats_clients_insert
+            AFTER INSERT ON clients
+            BEGIN
+                UPDATE stats_snapshot SET value = value + 1 WHERE metric = 'clients';
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_stats_clients_delete
+            AFTER DELETE ON clients
+            BEGIN
+                UPDATE stats_snapshot SET value = value - 1 WHERE metric = 'clients';
+            END
+            """,
+        ),
+    ),
+)
+
+
+async def get_schema_version(db: aiosqlite.Connection) -> int:
+    """Текущая версия схемы (0 - миграции еще не применялись)"""
+    async with db.execute("SELECT MAX(version) FROM schema_version") as cursor:
+        row = await cursor.fetchone()
+        return row[0] or 0
+
+
+async def apply_migrations(db: aiosqlite.Connection) -> int:
+    """Применить недостающие миграции. Возвращает итоговую версию схемы"""
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    await db.commit()
+    
+    current_version = await get_schema_version(db)
+    
+    for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+        if migration.version <= current_version:
+            continue
+        
+        # Каждый шаг применяется атомарно вместе с записью о версии
+        await db.execute("BEGIN IMMEDIATE")
+        try:
+            for statement in migration.statements:
+                await db.execute(statement)
+            await db.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (migration.version, migration.description)
+            )
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            logger.error(f"❌ Ошибка миграции схемы до версии {migration.version}")
+            raise
+        
+        current_version = migration.version
+        logger.info(f"✅ Схема БД обновлена до версии {migration.version}: {migration.description}")
+    
+    return current_version
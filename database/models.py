@@ -1,9 +1,11 @@
 """Модели данных"""
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, fields
+from typing import Dict, Generic, List, Optional, Tuple, TypeVar
 
+T = TypeVar("T")
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class User:
     """Пользователь бота"""
     user_id: int
@@ -11,7 +13,7 @@ class User:
     role: Optional[str]  # 'client' или 'trainer'
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Client:
     """Клиент с балансом лайков"""
     user_id: int
@@ -19,7 +21,7 @@ class Client:
     likes_count: int
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Trainer:
     """Анкета тренера"""
     id: Optional[int]
@@ -33,9 +35,11 @@ class Trainer:
     photo_id: Optional[str]
     status: str  # 'pending', 'approved', 'rejected'
     created_at: Optional[str]
+    likes_count: int = 0  # Поддерживается триггерами на таблице likes
+    version: int = 1  # Растет при каждом изменении анкеты или статуса
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Like:
     """Лайк клиента тренеру"""
     id: Optional[int]
@@ -44,3 +48,79 @@ class Like:
     trainer_id: int
     created_at: Optional[str]
 
+
+@dataclass(slots=True, frozen=True)
+class LikedTrainer:
+    """Строка списка лайкнутых тренеров: только то, что нужно для кнопки"""
+    id: int
+    name: str
+    direction: str
+
+
+@dataclass(slots=True, frozen=True)
+class LikeResult:
+    """Результат списания лайка клиентом"""
+    status: str  # 'ok', 'already_liked', 'no_likes', 'not_found'
+    likes_left: int
+    trainer_user_id: Optional[int] = None
+
+
+@dataclass(slots=True, frozen=True)
+class OutboxMessage:
+    """Уведомление, ожидающее отправки из outbox"""
+    id: int
+    chat_id: int
+    text: str
+    status: str  # 'pending', 'failed'
+    attempts: int
+    next_attempt_at: float
+    last_error: Optional[str]
+    created_at: Optional[str]
+
+
+@dataclass(slots=True, frozen=True)
+class DirectionSnapshot:
+    """Неизменяемый снимок списка одобренных анкет направления"""
+    direction: str
+    version: int
+    trainer_ids: Tuple[int, ...]
+
+
+@dataclass(slots=True, frozen=True)
+class StatsSnapshot:
+    """Сводная статистика из таблицы stats_snapshot"""
+    trainers: Dict[Tuple[str, str], int]  # (статус, направление) -> количество анкет
+    likes: int
+    clients: int
+    active_clients: int  # Клиенты, поставившие хотя бы один лайк
+    
+    def trainers_by_direction(self, status: str) -> Dict[str, int]:
+        """Количество анкет с указанным статусом по направлениям"""
+        return {
+            direction: count
+            for (trainer_status, direction), count in self.trainers.items()
+            if trainer_status == status and count
+        }
+    
+    def trainers_with_status(self, status: str) -> int:
+        """Количество анкет с указанным статусом"""
+        return sum(self.trainers_by_direction(status).values())
+
+
+@dataclass(slots=True, frozen=True)
+class Page(Generic[T]):
+    """Страница выборки и курсоры для запроса следующей и предыдущей"""
+    items: List[T]
+    next_cursor: Optional[str]  # None - это последняя страница
+    prev_cursor: Optional[str] = None  # None - это первая страница (или назад не листается)
+
+
+def column_list(model: type, alias: str = "") -> str:
+    """
+    Колонки для SELECT в порядке полей модели
+    
+    Строка выборки с такими колонками передается в модель позиционно:
+    Trainer(*row), без промежуточного словаря.
+    """
+    prefix = f"{alias}." if alias else ""
+    return ", ".join(prefix + field.name for field in fields(model))
@@ -0,0 +1,52 @@
+"""Профили настроек SQLite (PRAGMA), применяемые к каждому соединению"""
+from typing import Any, Dict, Tuple
+
+import aiosqlite
+
+# Порядок важен: режим журнала переключается первым
+PRAGMA_PROFILES: Dict[str, Tuple[Tuple[str, Any], ...]] = {
+    # WAL: читатели не блокируют запись и наоборот. synchronous=NORMAL в WAL
+    # не портит базу при сбое, но последние транзакции может потерять сбой ОС
+    "balanced": (
+        ("journal_mode", "WAL"),
+        ("synchronous", "NORMAL"),
+        ("busy_timeout", 5000),  # мс
+        ("cache_size", -65536),  # Отрицательное значение - в КиБ (64 МиБ)
+        ("mmap_size", 268435456),  # 256 МиБ
+        ("temp_store", "MEMORY"),
+    ),
+    # То же, но каждая зафиксированная транзакция переживает и сбой питания
+    "durable": (
+        ("journal_mode", "WAL"),
+        ("synchronous", "FULL"),
+        ("busy_timeout", 5000),
+        ("cache_size", -65536),
+        ("mmap_size", 268435456),
+        ("temp_store", "MEMORY"),
+    ),
+    # Настройки SQLite по умолчанию (журнал отката) - для сравнения
+    "sqlite_defaults": (),
+}
+
+DEFAULT_PROFILE = "balanced"
+
+
+def get_profile(name: str) -> Tuple[Tuple[str, Any], ...]:
+    """Найти профиль по имени"""
+    try:
+        return PRAGMA_PROFILES[name]
+    except KeyError:
+        raise ValueError(
+            f"Неизвестный профиль SQLite: {name} (доступны: {', '.join(PRAGMA_PROFILES)})"
+        ) from None
+
+
+async def apply_pragmas(conn: aiosqlite.Connection, profile: Tuple[Tuple[str, Any], ...]) -> Dict[str, Any]:
+    """Применить профиль к соединению. Возвращает значения, которые SQLite принял"""
+    applied = {}
+    for name, value in profile:
+        await conn.execute(f"PRAGMA {name} = {value}")
+        async with conn.execute(f"PRAGMA {name}") as cursor:
+            row = await cursor.fetchone()
+        applied[name] = row[0] if row else None
+    return applied
@@ -0,0 +1,95 @@
+"""Повторы операций с БД при конкуренции за блокировки SQLite"""
+import asyncio
+import logging
+import random
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Основные коды ошибок SQLite: база или таблица заняты другим соединением
+SQLITE_BUSY = 5
+SQLITE_LOCKED = 6
+
+
+class WriteNotApplied(sqlite3.OperationalError):
+    """
+    Транзакция пачки записей откатилась целиком: операция не применена,
+    повторить ее безопасно даже для неидемпотентной записи
+    
+    Исходная ошибка SQLite доступна в __cause__.
+    """
+
+
+def is_busy_error(error: BaseException) -> bool:
+    """Ошибка из-за занятой базы (database is locked / busy)"""
+    if isinstance(error, WriteNotApplied):
+        error = error.__cause__
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in (SQLITE_BUSY, SQLITE_LOCKED)
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+def is_retryable_read(error: BaseException) -> bool:
+    """Чтение можно повторять при любой занятости базы"""
+    return is_busy_error(error)
+
+
+def is_retryable_write(error: BaseException) -> bool:
+    """Запись повторяем, только если известно, что она не применилась"""
+    return isinstance(error, WriteNotApplied) and is_busy_error(error)
+
+
+@dataclass
+class RetryStats:
+    """Счетчики повторов"""
+    retries: int  # Повторных попыток
+    give_ups: int  # Операций, не выполненных до истечения срока
+
+
+class RetryPolicy:
+    """
+    Экспоненциальная пауза со случайным разбросом между попытками
+    и общий срок на операцию (deadline секунд от первой попытки)
+    """
+    
+    def __init__(self, base_delay: float = 0.05, max_delay: float = 1.0, deadline: float = 15.0):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retries = 0
+        self.give_ups = 0
+    
+    def delay(self, attempt: int) -> float:
+        """Пауза перед попыткой attempt (с 1): равномерно от 0 до экспоненциального предела"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+    
+    async def run(self, call: Callable[[], Awaitable[T]], retry_if: Callable[[BaseException], bool]) -> T:
+        """Выполнить call(), повторяя его, пока retry_if(ошибка) и срок не истек"""
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            try:
+                return await call()
+            except Exception as e:
+                if not retry_if(e):
+                    raise
+                attempt += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.give_ups += 1
+                    logger.warning(f"⚠️ База занята, операция не выполнена за {self.deadline} с ({attempt} попыток): {e}")
+                    raise
+                self.retries += 1
+                await asyncio.sleep(min(self.delay(attempt), remaining))
+    
+    def stats(self) -> RetryStats:
+        return RetryStats(retries=self.retries, give_ups=self.give_ups)
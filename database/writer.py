@@ -0,0 +1,184 @@
+"""Единственное соединение для записи с групповой фиксацией"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+import aiosqlite
+
+from .retry import WriteNotApplied, is_busy_error
+
+logger = logging.getLogger(__name__)
+
+# Операция записи: получает соединение внутри открытой транзакции и не фиксирует ее сама
+WriteOperation = Callable[[aiosqlite.Connection], Awaitable[Any]]
+
+
+class BoundWrite:
+    """
+    Операция записи func(db, *args)
+    
+    В отличие от замыкания передается в другой процесс (pickle), если func
+    объявлена на уровне модуля или класса - так воркеры отдают записи супервизору.
+    """
+    __slots__ = ("func", "args")
+    
+    def __init__(self, func: Callable[..., Awaitable[Any]], *args: Any):
+        self.func = func
+        self.args = args
+    
+    def __call__(self, db: aiosqlite.Connection) -> Awaitable[Any]:
+        return self.func(db, *self.args)
+
+
+@dataclass
+class WriterStats:
+    """Статистика групповой фиксации"""
+    operations: int  # Выполнено операций
+    batches: int  # Выполнено транзакций (COMMIT)
+    max_batch: int  # Наибольшее число операций в одной транзакции
+    
+    @property
+    def avg_batch(self) -> float:
+        return self.operations / self.batches if self.batches else 0.0
+
+
+class DatabaseWriter:
+    """
+    Владеет единственным соединением для записи в процессе
+    
+    Операции ставятся в очередь и выполняются по порядку. Все, что пришло
+    за window секунд (не больше max_batch), выполняется в одной транзакции:
+    каждая операция в своем SAVEPOINT, так что ошибка откатывает только ее,
+    а затем один COMMIT на всю пачку. Результат или исключение операции
+    вызывающий получает после фиксации. Если не удалось начать или
+    зафиксировать саму транзакцию, все операции пачки получают WriteNotApplied.
+    """
+    
+    def __init__(
+        self,
+        connect: Callable[[], Awaitable[aiosqlite.Connection]],
+        window: float = 0.002,
+        max_batch: int = 100
+    ):
+        self._connect = connect
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self.conn: Optional[aiosqlite.Connection] = None
+        self._queue: "asyncio.Queue[Optional[Tuple[WriteOperation, asyncio.Future]]]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self.operations = 0
+        self.batches = 0
+        self.max_batch_seen = 0
+    
+    async def open(self) -> aiosqlite.Connection:
+        """Открыть соединение; очередь запускается отдельно через start()"""
+        if self.conn is None:
+            self.conn = await self._connect()
+        return self.conn
+    
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def submit(self, operation: WriteOperation) -> Any:
+        """Выполнить операцию записи и дождаться фиксации ее транзакции"""
+        if self._task is None:
+            raise RuntimeError("Запись в БД не запущена: вызовите init_db()")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((operation, future))
+        return await future
+    
+    def stats(self) -> WriterStats:
+        return WriterStats(operations=self.operations, batches=self.batches, max_batch=self.max_batch_seen)
+    
+    async def close(self):
+        """Выполнить уже поставленные операции и закрыть соединение"""
+        if self._task is not None:
+            self._queue.put_nowait(None)
+            await self._task
+            self._task = None
+        if self.conn is not None:
+            await self.conn.close()
+            self.conn = None
+    
+    async def _collect(self, first: Tuple[WriteOperation, asyncio.Future]) -> Tuple[List, bool]:
+        """Добрать операции, пришедшие за окно группировки. Возвращает пачку и признак остановки"""
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.window
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+    
+    async def _run(self):
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            batch, stopping = await self._collect(item)
+            await self._execute(batch)
+            if stopping:
+                return
+    
+    async def _execute(self, batch: List[Tuple[WriteOperation, asyncio.Future]]):
+        conn = self.conn
+        outcomes = []
+        try:
+            await conn.execute("BEGIN IMMEDIATE")
+            for operation, future in batch:
+                if future.done():
+                    # Вызывающий уже не ждет (отменен)
+                    continue
+                await conn.execute("SAVEPOINT write_op")
+                try:
+                    result = await operation(conn)
+                except Exception as e:
+                    await conn.execute("ROLLBACK TO write_op")
+                    await conn.execute("RELEASE write_op")
+                    outcomes.append((future, None, e))
+                else:
+                    await conn.execute("RELEASE write_op")
+                    outcomes.append((future, result, None))
+            await conn.commit()
+        except Exception as e:
+            # Не удалось начать или зафиксировать транзакцию - не применилась ни одна операция.
+            # Занятую базу не логируем: такие записи повторяет Database.write
+            if not is_busy_error(e):
+                logger.error(f"❌ Ошибка фиксации пачки записей ({len(batch)} операций): {e}")
+            error: Exception = WriteNotApplied(f"Пачка записей не зафиксирована: {e}")
+            error.__cause__ = e
+            try:
+                if conn.in_transaction:
+                    await conn.rollback()
+            except Exception as rollback_error:
+                # Состояние транзакции неизвестно - повторять записи небезопасно
+                logger.error(f"❌ Не удалось откатить пачку записей: {rollback_error}")
+                error = e
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        
+        self.batches += 1
+        self.operations += len(outcomes)
+        self.max_batch_seen = max(self.max_batch_seen, len(outcomes))
+        for future, result, error in outcomes:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
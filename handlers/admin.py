@@ -6,7 +6,7 @@ from aiogram.fsm.context import FSMContext
 
 from database import Database
 from keyboards.inline import (
-    get_moderation_keyboard,
+    get_moderation_queue_keyboard,
     get_admin_stats_keyboard,
     get_direction_stats_keyboard,
     get_trainers_list_keyboard,
@@ -19,66 +19,15 @@ from keyboards.inline import (
 from config import TRAINING_DIRECTIONS, is_admin
 from states import AdminAddLikes
 from messages import get_welcome_message
+from services.card_renderer import render_trainer_card, STYLE_MODERATION, STYLE_DETAIL
+from services.send_scheduler import send_priority, PRIORITY_NOTIFICATION
+from services.trainer_card import send_trainer_card, delete_trainer_card
 
 router = Router()
 
-
-async def send_admin_trainer_card_smart(message, trainer, keyboard):
-    """Умная отправка анкеты тренера для админа с разделением по полю 'О себе'"""
-    # Создаем основной текст без поля "О себе"
-    main_text = (
-        "🆕 <b>Анкета тренера на модерации</b>\n\n"
-        f"<b>Имя:</b> {trainer.name}\n"
-        f"<b>Возраст:</b> {trainer.age} лет\n"
-        f"<b>Опыт:</b> {trainer.experience}\n"
-        f"<b>Направление:</b> {trainer.direction}\n\n"
-        f"<b>Username:</b> @{trainer.username if trainer.username else 'не указан'}\n"
-        f"<b>User ID:</b> {trainer.user_id}"
-    )
-    
-    # Проверяем, помещается ли основной текст + описание в лимит
-    full_text = main_text + f"\n\n<b>О себе:</b>\n{trainer.about}"
-    
-    if len(full_text) <= 1024:
-        # Если помещается - отправляем одним сообщением
-        try:
-            if trainer.photo_id:
-                await message.answer_photo(
-                    photo=trainer.photo_id,
-                    caption=full_text,
-                    reply_markup=keyboard
-                )
-            else:
-                await message.answer(
-                    full_text,
-                    reply_markup=keyboard
-                )
-        except Exception as e:
-            print(f"Ошибка отправки анкеты {trainer.id}: {e}")
-            # В случае ошибки отправляем без фото
-            await message.answer(full_text, reply_markup=keyboard)
-    else:
-        # Если не помещается - отправляем основную часть с фото, описание отдельно
-        try:
-            if trainer.photo_id:
-                await message.answer_photo(
-                    photo=trainer.photo_id,
-                    caption=main_text
-                )
-            else:
-                await message.answer(main_text)
-            
-            # Отправляем описание отдельным сообщением с кнопками
-            await message.answer(
-                f"<b>О себе:</b>\n{trainer.about}",
-                reply_markup=keyboard
-            )
-        except Exception as e:
-            print(f"Ошибка отправки анкеты {trainer.id}: {e}")
-            # В случае ошибки отправляем все текстом
-            await message.answer(full_text, reply_markup=keyboard)
-
-
+# Размер страниц в списках админ-панели
+TRAINERS_PAGE_SIZE = 10
+LIKES_PAGE_SIZE = 20
 
 
 @router.message(Command("stats"))
@@ -202,8 +151,12 @@ async def process_admin_direction(callback: CallbackQuery, db: Database):
         await callback.answer("❌ Недостаточно прав", show_alert=True)
         return
     
-    direction = callback.data.split(":", 1)[1]
-    trainers = await db.get_approved_trainers_by_direction(direction)
+    # admin_dir:<направление>[:<курсор страницы>]
+    parts = callback.data.split(":")
+    direction = parts[1]
+    cursor = parts[2] if len(parts) > 2 else None
+    page = await db.get_approved_trainers_page(direction=direction, cursor=cursor, limit=TRAINERS_PAGE_SIZE)
+    trainers = page.items
     
     if not trainers:
         # Если сообщение содержит фото, удаляем его и отправляем новое текстовое
@@ -223,12 +176,13 @@ async def process_admin_direction(callback: CallbackQuery, db: Database):
         await callback.answer()
         return
     
+    # Общее число берем из stats_snapshot, который ведут триггеры
+    counts = await db.count_approved_trainers_by_direction()
     text = f"📋 <b>Направление: {direction}</b>\n\n"
-    text += f"Всего тренеров: {len(trainers)}\n\n"
+    text += f"Всего тренеров: {counts.get(direction, 0)}\n\n"
     
-    for i, trainer in enumerate(trainers, 1):
-        likes_count = len(await db.get_trainer_likes(trainer.id))
-        text += f"{i}. {trainer.name} ({trainer.age} лет) - ❤️ {likes_count}\n"
+    for trainer in trainers:
+        text += f"• {trainer.name} ({trainer.age} лет) - ❤️ {trainer.likes_count}\n"
     
     # Создаем клавиатуру со списком тренеров
     from aiogram.utils.keyboard import InlineKeyboardBuilder
@@ -242,6 +196,26 @@ async def process_admin_direction(callback: CallbackQuery, db: Database):
                 callback_data=f"admin_trainer_dir:{trainer.id}:{direction}"
             )
         )
+    
+    # Навигация по страницам
+    nav_buttons = []
+    if cursor is not None:
+        nav_buttons.append(
+            InlineKeyboardButton(
+                text="⏮ В начало",
+                callback_data=f"admin_dir:{direction}"
+            )
+        )
+    if page.next_cursor:
+        nav_buttons.append(
+            InlineKeyboardButton(
+                text="➡️ Вперёд",
+                callback_data=f"admin_dir:{direction}:{page.next_cursor}"
+            )
+        )
+    if nav_buttons:
+        builder.row(*nav_buttons)
+    
     builder.row(
         InlineKeyboardButton(
             text="🔙 Назад",
@@ -261,13 +235,39 @@ async def process_admin_direction(callback: CallbackQuery, db: Database):
 @router.callback_query(F.data == "admin_all_trainers")
 async def process_all_trainers(callback: CallbackQuery, db: Database):
     """Просмотр всех тренеров"""
+    await show_all_trainers(callback, db)
+
+
+@router.callback_query(F.data.startswith("admin_page:"))
+async def process_all_trainers_page(callback: CallbackQuery, db: Database):
+    """Следующая страница списка всех тренеров"""
+    cursor = callback.data.split(":", 1)[1]
+    await show_all_trainers(callback, db, cursor)
+
+
+@router.callback_query(F.data.startswith("admin_page_prev:"))
+async def process_all_trainers_prev_page(callback: CallbackQuery, db: Database):
+    """Предыдущая страница списка всех тренеров"""
+    before = callback.data.split(":", 1)[1]
+    await show_all_trainers(callback, db, before=before)
+
+
+async def show_all_trainers(callback: CallbackQuery, db: Database, cursor: str = None, before: str = None):
+    """Показать страницу списка всех одобренных тренеров"""
     if not is_admin(callback.from_user.id):
         await callback.answer("❌ Недостаточно прав", show_alert=True)
         return
     
-    trainers = await db.get_all_approved_trainers()
+    # Счетчики читаются из stats_snapshot - не зависят от размера таблиц
+    stats = await db.get_stats()
+    counts = stats.trainers_by_direction('approved')
+    page = await db.get_approved_trainers_page(cursor=cursor, limit=TRAINERS_PAGE_SIZE, before=before)
+    if not page.items and before is not None:
+        # Предыдущие анкеты успели убрать - открываем первую страницу
+        before = None
+        page = await db.get_approved_trainers_page(limit=TRAINERS_PAGE_SIZE)
     
-    if not trainers:
+    if not page.items and cursor is None and before is None:
         # Если сообщение содержит фото, удаляем его и отправляем новое текстовое
         if callback.message.photo:
             await callback.message.delete()
@@ -285,55 +285,24 @@ async def process_all_trainers(callback: CallbackQuery, db: Database):
         await callback.answer()
         return
     
-    # Группируем по направлениям
-    by_direction = {}
-    for trainer in trainers:
-        if trainer.direction not in by_direction:
-            by_direction[trainer.direction] = []
-        by_direction[trainer.direction].append(trainer)
-    
     text = "📋 <b>Все одобренные тренеры</b>\n\n"
     for direction in TRAINING_DIRECTIONS:
-        if direction in by_direction:
-            text += f"<b>{direction}:</b> {len(by_direction[direction])}\n"
+        if direction in counts:
+            text += f"<b>{direction}:</b> {counts[direction]}\n"
     
-    text += f"\n<b>Всего:</b> {len(trainers)}"
+    text += f"\n<b>Всего:</b> {sum(counts.values())}\n"
+    text += f"<b>На модерации:</b> {stats.trainers_with_status('pending')}\n\n"
+    text += f"<b>Лайков:</b> {stats.likes}\n"
+    text += f"<b>Клиентов:</b> {stats.clients} (с лайками: {stats.active_clients})"
     
-    # Создаем клавиатуру со списком
-    from aiogram.utils.keyboard import InlineKeyboardBuilder
-    from aiogram.types import InlineKeyboardButton
-    
-    builder = InlineKeyboardBuilder()
-    for trainer in trainers[:10]:  # Показываем первых 10
-        likes_count = len(await db.get_trainer_likes(trainer.id))
-        builder.row(
-            InlineKeyboardButton(
-                text=f"{trainer.name} ({trainer.direction}) - ❤️ {likes_count}",
-                callback_data=f"admin_trainer:{trainer.id}"
-            )
-        )
-    
-    if len(trainers) > 10:
-        builder.row(
-            InlineKeyboardButton(
-                text=f"... и еще {len(trainers) - 10} тренеров",
-                callback_data="admin_all_trainers"
-            )
-        )
-    
-    builder.row(
-        InlineKeyboardButton(
-            text="🔙 К статистике",
-            callback_data="admin_stats"
-        )
-    )
+    keyboard = get_trainers_list_keyboard(page.items, page.next_cursor, page.prev_cursor)
     
     # Если сообщение содержит фото, удаляем его и отправляем новое текстовое
     if callback.message.photo:
         await callback.message.delete()
-        await callback.message.answer(text, reply_markup=builder.as_markup())
+        await callback.message.answer(text, reply_markup=keyboard)
     else:
-        await callback.message.edit_text(text, reply_markup=builder.as_markup())
+        await callback.message.edit_text(text, reply_markup=keyboard)
     await callback.answer()
 
 
@@ -370,27 +339,17 @@ async def show_trainer_detail(callback: CallbackQuery, db: Database, trainer_id:
         await callback.answer("❌ Тренер не найден", show_alert=True)
         return
     
-    likes = await db.get_trainer_likes(trainer_id)
-    
-    # Создаем основной текст без поля "О себе"
-    main_text = (
-        f"👤 <b>Детали анкеты</b>\n\n"
-        f"<b>Имя:</b> {trainer.name}\n"
-        f"<b>Возраст:</b> {trainer.age} лет\n"
-        f"<b>Опыт:</b> {trainer.experience}\n"
-        f"<b>Направление:</b> {trainer.direction}\n"
-        f"<b>Статус:</b> {trainer.status}\n"
-        f"<b>Username:</b> @{trainer.username if trainer.username else 'не указан'}\n"
-        f"<b>User ID:</b> {trainer.user_id}\n\n"
-        f"<b>Количество лайков:</b> {len(likes)}"
+    card = render_trainer_card(
+        trainer,
+        STYLE_DETAIL,
+        prefix="👤 <b>Детали анкеты</b>",
+        suffix=f"<b>Количество лайков:</b> {trainer.likes_count}"
     )
-    
-    # Проверяем, помещается ли основной текст + описание в лимит
-    full_text = main_text + f"\n\n<b>О себе:</b>\n{trainer.about}"
+    main_text, full_text = card.main_text, card.full_text
     
     keyboard = get_trainer_detail_keyboard(trainer_id, from_direction)
     
-    if len(full_text) <= 1024:
+    if not card.is_split:
         # Если помещается - отправляем одним сообщением
         try:
             await callback.message.delete()
@@ -419,7 +378,7 @@ async def show_trainer_detail(callback: CallbackQuery, db: Database, trainer_id:
             
             # Отправляем описание отдельным сообщением с кнопками
             await callback.message.answer(
-                f"<b>О себе:</b>\n{trainer.about}",
+                card.about_text,
                 reply_markup=keyboard
             )
         except Exception as e:
@@ -436,16 +395,20 @@ async def process_admin_likes(callback: CallbackQuery, db: Database):
         await callback.answer("❌ Недостаточно прав", show_alert=True)
         return
     
-    trainer_id = int(callback.data.split(":", 1)[1])
+    # admin_likes:<ID тренера>[:<курсор страницы>:<сколько лайков уже показано>]
+    parts = callback.data.split(":")
+    trainer_id = int(parts[1])
+    cursor = parts[2] if len(parts) > 2 else None
+    shown = int(parts[3]) if len(parts) > 3 else 0
     trainer = await db.get_trainer_by_id(trainer_id)
-    likes = await db.get_trainer_likes(trainer_id)
+    page = await db.get_trainer_likes_page(trainer_id, cursor=cursor, limit=LIKES_PAGE_SIZE)
     
-    if not likes:
+    if not page.items:
         text = f"💕 <b>Лайки для {trainer.name}</b>\n\nПока нет лайков."
     else:
         text = f"💕 <b>Лайки для {trainer.name}</b>\n\n"
-        text += f"Всего лайков: {len(likes)}\n\n"
-        for i, like in enumerate(likes, 1):
+        text += f"Всего лайков: {trainer.likes_count}\n\n"
+        for i, like in enumerate(page.items, shown + 1):
             contact = f"@{like.client_username}" if like.client_username else f"ID: {like.client_id}"
             text += f"{i}. {contact}\n"
     
@@ -454,12 +417,12 @@ async def process_admin_likes(callback: CallbackQuery, db: Database):
         await callback.message.delete()
         await callback.message.answer(
             text,
-            reply_markup=get_back_to_trainer_keyboard(trainer_id)
+            reply_markup=get_back_to_trainer_keyboard(trainer_id, page.next_cursor, shown + len(page.items))
         )
     else:
         await callback.message.edit_text(
             text,
-            reply_markup=get_back_to_trainer_keyboard(trainer_id)
+            reply_markup=get_back_to_trainer_keyboard(trainer_id, page.next_cursor, shown + len(page.items))
         )
     await callback.answer()
 
@@ -504,14 +467,15 @@ async def process_confirm_delete(callback: CallbackQuery, bot: Bot, db: Database
     
     if trainer:
         # Уведомляем тренера
-        try:
-            await bot.send_message(
-                trainer.user_id,
-                "❌ Ваша анкета была удалена администратором.\n\n"
-                "Вы можете создать новую анкету через /start"
-            )
-        except Exception:
-            pass
+        with send_priority(PRIORITY_NOTIFICATION):
+            try:
+                await bot.send_message(
+                    trainer.user_id,
+                    "❌ Ваша анкета была удалена администратором.\n\n"
+                    "Вы можете создать новую анкету через /start"
+                )
+            except Exception:
+                pass
         
         # Удаляем анкету
         await db.delete_trainer(trainer_id)
@@ -548,13 +512,16 @@ async def process_confirm_delete(callback: CallbackQuery, bot: Bot, db: Database
 # === Модерация анкет ===
 
 @router.callback_query(F.data.startswith("approve:"))
-async def process_approve(callback: CallbackQuery, bot: Bot, db: Database):
+async def process_approve(callback: CallbackQuery, bot: Bot, db: Database, state: FSMContext):
     """Одобрение анкеты тренера"""
     if not is_admin(callback.from_user.id):
         await callback.answer("❌ Недостаточно прав", show_alert=True)
         return
     
-    trainer_id = int(callback.data.split(":", 1)[1])
+    # Кнопки очереди модерации помечены суффиксом ":queue"
+    parts = callback.data.split(":")
+    trainer_id = int(parts[1])
+    from_queue = parts[-1] == "queue"
     trainer = await db.get_trainer_by_id(trainer_id)
     
     if not trainer:
@@ -573,15 +540,27 @@ async def process_approve(callback: CallbackQuery, bot: Bot, db: Database):
     await db.update_trainer_status(trainer_id, "approved")
     
     # Уведомляем тренера
-    try:
-        await bot.send_message(
-            trainer.user_id,
-            "✅ <b>Ваша анкета одобрена!</b>\n\n"
-            "Теперь клиенты могут видеть вашу анкету.\n"
-            "Вы будете получать уведомления, когда кто-то лайкнет вашу анкету."
-        )
-    except Exception:
-        pass
+    with send_priority(PRIORITY_NOTIFICATION):
+        try:
+            await bot.send_message(
+                trainer.user_id,
+                "✅ <b>Ваша анкета одобрена!</b>\n\n"
+                "Теперь клиенты могут видеть вашу анкету.\n"
+                "Вы будете получать уведомления, когда кто-то лайкнет вашу анкету."
+            )
+        except Exception:
+            pass
+    
+    # Из очереди модерации сразу переходим к следующей анкете
+    if from_queue:
+        await callback.answer("✅ Анкета одобрена!")
+        # Дойдя до конца, возвращаемся к началу очереди (анкеты, пропущенные ранее)
+        if not (
+            await show_pending_trainer(callback, db, state, after_id=trainer_id)
+            or await show_pending_trainer(callback, db, state)
+        ):
+            await show_empty_queue(callback, state)
+        return
     
     # Обновляем сообщение (для анкет с фото используем caption, без фото - text)
     if callback.message.photo:
@@ -627,13 +606,16 @@ async def process_approve(callback: CallbackQuery, bot: Bot, db: Database):
 
 
 @router.callback_query(F.data.startswith("reject:"))
-async def process_reject(callback: CallbackQuery, bot: Bot, db: Database):
+async def process_reject(callback: CallbackQuery, bot: Bot, db: Database, state: FSMContext):
     """Отклонение анкеты тренера"""
     if not is_admin(callback.from_user.id):
         await callback.answer("❌ Недостаточно прав", show_alert=True)
         return
     
-    trainer_id = int(callback.data.split(":", 1)[1])
+    # Кнопки очереди модерации помечены суффиксом ":queue"
+    parts = callback.data.split(":")
+    trainer_id = int(parts[1])
+    from_queue = parts[-1] == "queue"
     trainer = await db.get_trainer_by_id(trainer_id)
     
     if not trainer:
@@ -652,19 +634,31 @@ async def process_reject(callback: CallbackQuery, bot: Bot, db: Database):
     await db.update_trainer_status(trainer_id, "rejected")
     
     # Уведомляем тренера
-    try:
-        await bot.send_message(
-            trainer.user_id,
-            "❌ <b>Ваша анкета отклонена</b>\n\n"
-            "К сожалению, ваша анкета не прошла модерацию.\n"
-            "Возможные причины:\n"
-            "- Некорректная информация\n"
-            "- Указаны контактные данные в описании\n"
-            "- Нарушение правил платформы\n\n"
-            "Вы можете создать новую анкету через /start"
-        )
-    except Exception:
-        pass
+    with send_priority(PRIORITY_NOTIFICATION):
+        try:
+            await bot.send_message(
+                trainer.user_id,
+                "❌ <b>Ваша анкета отклонена</b>\n\n"
+                "К сожалению, ваша анкета не прошла модерацию.\n"
+                "Возможные причины:\n"
+                "- Некорректная информация\n"
+                "- Указаны контактные данные в описании\n"
+                "- Нарушение правил платформы\n\n"
+                "Вы можете создать новую анкету через /start"
+            )
+        except Exception:
+            pass
+    
+    # Из очереди модерации сразу переходим к следующей анкете
+    if from_queue:
+        await callback.answer("❌ Анкета отклонена!")
+        # Дойдя до конца, возвращаемся к началу очереди (анкеты, пропущенные ранее)
+        if not (
+            await show_pending_trainer(callback, db, state, after_id=trainer_id)
+            or await show_pending_trainer(callback, db, state)
+        ):
+            await show_empty_queue(callback, state)
+        return
     
     # Обновляем сообщение (для анкет с фото используем caption, без фото - text)
     if callback.message.photo:
@@ -877,69 +871,114 @@ async def process_admin_amount_input(message: Message, state: FSMContext, bot: B
     
     # Уведомляем клиента
     try:
-        await bot.send_message(
-            user_id,
-            f"🎉 <b>Ваш баланс лайков пополнен!</b>\n\n"
-            f"Начислено: <b>+{likes_amount}</b> лайков\n"
-            f"Текущий баланс: <b>{new_balance}</b> лайков\n\n"
-            f"Продолжайте искать своего идеального тренера!"
-        )
+        with send_priority(PRIORITY_NOTIFICATION):
+            await bot.send_message(
+                user_id,
+                f"🎉 <b>Ваш баланс лайков пополнен!</b>\n\n"
+                f"Начислено: <b>+{likes_amount}</b> лайков\n"
+                f"Текущий баланс: <b>{new_balance}</b> лайков\n\n"
+                f"Продолжайте искать своего идеального тренера!"
+            )
     except Exception as e:
         await message.answer(f"⚠️ Не удалось отправить уведомление клиенту: {e}")
 
 
+MODERATION_PREFIX = "🆕 <b>Анкета тренера на модерации</b>"
+EMPTY_QUEUE_TEXT = (
+    "📋 <b>Анкеты на модерации</b>\n\n"
+    "Нет анкет, ожидающих модерации."
+)
+
+
+async def show_pending_trainer(
+    callback: CallbackQuery,
+    db: Database,
+    state: FSMContext,
+    after_id: int = None,
+    before_id: int = None
+) -> bool:
+    """
+    Показать одну анкету из очереди модерации, отредактировав карточку на месте
+    
+    Возвращает False, если в нужном направлении анкет больше нет.
+    """
+    if before_id is not None:
+        page = await db.get_pending_trainers(before_id=before_id, limit=1)
+        if not page:
+            return False
+        # Следующая анкета есть - та, с которой пришли
+        trainer, has_next = page[0], True
+    else:
+        # Берем на одну анкету больше: вторая - следующая в очереди
+        page = await db.get_pending_trainers(after_id=after_id, limit=2)
+        if not page:
+            return False
+        trainer, has_next = page[0], len(page) > 1
+        if has_next:
+            # Заранее собираем карточку следующей анкеты, чтобы переход был мгновенным
+            render_trainer_card(page[1], STYLE_MODERATION)
+    
+    total = await db.count_pending_trainers()
+    await send_trainer_card(
+        callback,
+        trainer,
+        get_moderation_queue_keyboard(trainer.id, has_next),
+        prefix=MODERATION_PREFIX,
+        status_info=f"📋 В очереди: {total}",
+        state=state,
+        style=STYLE_MODERATION
+    )
+    return True
+
+
+async def show_empty_queue(callback: CallbackQuery, state: FSMContext):
+    """Заменить карточку очереди сообщением о том, что анкет не осталось"""
+    await delete_trainer_card(callback, state)
+    await callback.message.answer(EMPTY_QUEUE_TEXT, reply_markup=get_admin_stats_keyboard())
+
+
 @router.callback_query(F.data == "admin_pending_trainers")
-async def process_admin_pending_trainers(callback: CallbackQuery, db: Database):
+async def process_admin_pending_trainers(callback: CallbackQuery, db: Database, state: FSMContext):
     """Обработчик кнопки 'Проверить анкеты на модерации'"""
     if not is_admin(callback.from_user.id):
         await callback.answer("❌ Недостаточно прав", show_alert=True)
         return
     
-    pending_trainers = await db.get_pending_trainers()
-    
-    if not pending_trainers:
+    if not await show_pending_trainer(callback, db, state):
         # Если сообщение содержит фото, удаляем его и отправляем новое текстовое
         if callback.message.photo:
             await callback.message.delete()
-            await callback.message.answer(
-                "📋 <b>Анкеты на модерации</b>\n\n"
-                "Нет анкет, ожидающих модерации.",
-                reply_markup=get_admin_stats_keyboard()
-            )
+            await callback.message.answer(EMPTY_QUEUE_TEXT, reply_markup=get_admin_stats_keyboard())
         else:
-            await callback.message.edit_text(
-                "📋 <b>Анкеты на модерации</b>\n\n"
-                "Нет анкет, ожидающих модерации.",
-                reply_markup=get_admin_stats_keyboard()
-            )
-        await callback.answer()
+            await callback.message.edit_text(EMPTY_QUEUE_TEXT, reply_markup=get_admin_stats_keyboard())
+    await callback.answer()
+
+
+@router.callback_query(F.data.startswith("mod_next:"))
+async def process_moderation_next(callback: CallbackQuery, db: Database, state: FSMContext):
+    """Следующая анкета в очереди модерации"""
+    if not is_admin(callback.from_user.id):
+        await callback.answer("❌ Недостаточно прав", show_alert=True)
         return
     
-    # Если сообщение содержит фото, удаляем его и отправляем новое текстовое
-    if callback.message.photo:
-        await callback.message.delete()
-        await callback.message.answer(
-            f"📋 <b>Анкеты на модерации</b>\n\n"
-            f"Всего анкет: {len(pending_trainers)}\n\n"
-            f"Анкеты отправлены вам в чат."
-        )
-    else:
-        await callback.message.edit_text(
-            f"📋 <b>Анкеты на модерации</b>\n\n"
-            f"Всего анкет: {len(pending_trainers)}\n\n"
-            f"Анкеты отправлены вам в чат."
-        )
-    
-    # Отправляем каждую анкету отдельным сообщением
-    for trainer in pending_trainers:
-        keyboard = get_moderation_keyboard(trainer.id)
-        await send_admin_trainer_card_smart(callback.message, trainer, keyboard)
+    trainer_id = int(callback.data.split(":", 1)[1])
+    if not await show_pending_trainer(callback, db, state, after_id=trainer_id):
+        await callback.answer("Это последняя анкета в очереди", show_alert=True)
+        return
+    await callback.answer()
+
+
+@router.callback_query(F.data.startswith("mod_prev:"))
+async def process_moderation_prev(callback: CallbackQuery, db: Database, state: FSMContext):
+    """Предыдущая анкета в очереди модерации"""
+    if not is_admin(callback.from_user.id):
+        await callback.answer("❌ Недостаточно прав", show_alert=True)
+        return
     
-    # В конце отправляем кнопку возврата
-    await callback.message.answer(
-        "Все анкеты на модерации показаны выше ☝️",
-        reply_markup=get_admin_stats_keyboard()
-    )
+    trainer_id = int(callback.data.split(":", 1)[1])
+    if not await show_pending_trainer(callback, db, state, before_id=trainer_id):
+        await callback.answer("Это первая анкета в очереди", show_alert=True)
+        return
     await callback.answer()
 
 
@@ -1019,13 +1058,14 @@ async def cmd_add_likes(message: Message, bot: Bot, db: Database):
     
     # Уведомляем клиента
     try:
-        await bot.send_message(
-            user_id,
-            f"🎉 <b>Ваш баланс лайков пополнен!</b>\n\n"
-            f"Начислено: <b>+{likes_amount}</b> лайков\n"
-            f"Текущий баланс: <b>{new_balance}</b> лайков\n\n"
-            f"Продолжайте искать своего идеального тренера!"
-        )
+        with send_priority(PRIORITY_NOTIFICATION):
+            await bot.send_message(
+                user_id,
+                f"🎉 <b>Ваш баланс лайков пополнен!</b>\n\n"
+                f"Начислено: <b>+{likes_amount}</b> лайков\n"
+                f"Текущий баланс: <b>{new_balance}</b> лайков\n\n"
+                f"Продолжайте искать своего идеального тренера!"
+            )
     except Exception as e:
         await message.answer(f"⚠️ Не удалось отправить уведомление клиенту: {e}")
 
@@ -1,306 +1,27 @@
 """Обработчики для клиентов"""
 from aiogram import Router, F, Bot
-from aiogram.types import CallbackQuery, InputMediaPhoto
+from aiogram.types import CallbackQuery
 from aiogram.fsm.context import FSMContext
 
-from database import Database
+from database import Database, WriteNotApplied
 from keyboards.inline import get_directions_keyboard, get_trainer_view_keyboard, get_refill_tariffs_keyboard, get_role_keyboard, get_liked_trainers_keyboard
 from config import ADMIN_IDS, PLACEMENT_COST, is_admin
-from services.trainer_card import send_trainer_card
+from services.trainer_card import send_trainer_card, detach_card_main_part
+from services.fanout import fan_out_in_background
 from messages import get_welcome_message
 
 router = Router()
 
 
-async def send_trainer_card_smart(message, trainer, current_index: int, total: int, keyboard, should_delete_previous=False, state: FSMContext = None):
-    """Умная отправка анкеты тренера с разделением по полю 'О себе'"""
-    # Создаем основной текст без поля "О себе"
-    main_text = (
-        f"<b>{trainer.name}</b>\n"
-        f"Возраст: {trainer.age} лет\n"
-        f"Опыт: {trainer.experience}\n"
-        f"Направление: {trainer.direction}\n\n"
-        f"Анкета {current_index + 1}/{total}"
-    )
-    
-    # Проверяем, помещается ли основной текст + описание в лимит
-    full_text = main_text + f"\n\n<b>О себе:</b>\n{trainer.about}"
-    
-    if len(full_text) <= 1024:
-        # Если помещается - отправляем одним сообщением
-        try:
-            if message.photo:
-                await message.edit_media(
-                    media=InputMediaPhoto(media=trainer.photo_id, caption=full_text),
-                    reply_markup=keyboard
-                )
-                # Сохраняем ID сообщения для последующего удаления
-                if state:
-                    await state.update_data(current_message_id=message.message_id)
-            else:
-                if should_delete_previous:
-                    await message.delete()
-                sent_message = await message.answer_photo(
-                    photo=trainer.photo_id,
-                    caption=full_text,
-                    reply_markup=keyboard
-                )
-                # Сохраняем ID сообщения для последующего удаления
-                if state:
-                    # Сначала сохраняем текущий ID как предыдущий (если он есть)
-                    data = await state.get_data()
-                    current_message_id = data.get('current_message_id')
-                    current_main_message_id = data.get('current_main_message_id')
-                    
-                    # Для одиночных сообщений храним ID только в current_message_id
-                    # Для разделенных сообщений храним оба ID
-                    if current_main_message_id:
-                        # Предыдущее сообщение было разделено на две части
-                        await state.update_data(
-                            previous_message_id=current_message_id,
-                            previous_main_message_id=current_main_message_id
-                        )
-                        print(f"DEBUG: Сохранили предыдущие ID (разделенное) - main: {current_main_message_id}, about: {current_message_id}")
-                    elif current_message_id:
-                        # Предыдущее сообщение было одиночным
-                        await state.update_data(
-                            previous_message_id=current_message_id,
-                            previous_main_message_id=None
-                        )
-                        print(f"DEBUG: Сохранили предыдущий ID (одиночное с фото): {current_message_id}")
-                    
-                    # Теперь сохраняем новый ID как текущий (сбрасываем main_message_id для одиночного сообщения)
-                    await state.update_data(
-                        current_message_id=sent_message.message_id,
-                        current_main_message_id=None
-                    )
-                    print(f"DEBUG: Сохранили новый ID одиночного сообщения с фото: {sent_message.message_id}")
-        except Exception as e:
-            print(f"Ошибка отправки анкеты тренера {trainer.id}: {e}")
-            # В случае ошибки отправляем без фото
-            try:
-                if message.photo and should_delete_previous:
-                    await message.delete()
-                sent_message = await message.answer(full_text, reply_markup=keyboard)
-                # Сохраняем ID сообщения для последующего удаления
-                if state:
-                    await state.update_data(current_message_id=sent_message.message_id)
-            except Exception as e2:
-                print(f"Критическая ошибка отправки анкеты тренера {trainer.id}: {e2}")
-                sent_message = await message.answer(full_text, reply_markup=keyboard)
-                if state:
-                    await state.update_data(current_message_id=sent_message.message_id)
-    else:
-        # Если не помещается - отправляем основную часть с фото, описание отдельно
-        try:
-            if should_delete_previous:
-                # Удаляем предыдущие сообщения если они есть
-                data = await state.get_data() if state else {}
-                previous_message_id = data.get('previous_message_id')
-                previous_main_message_id = data.get('previous_main_message_id')
-                
-                print(f"DEBUG: Удаляем предыдущие сообщения - main: {previous_main_message_id}, about: {previous_message_id}")
-                
-                # Удаляем предыдущие сообщения только если они существуют
-                if previous_main_message_id:
-                    try:
-                        await message.bot.delete_message(message.chat.id, previous_main_message_id)
-                        print(f"DEBUG: Успешно удалено предыдущее основное сообщение {previous_main_message_id}")
-                    except Exception as e:
-                        print(f"DEBUG: Ошибка удаления предыдущего основного сообщения {previous_main_message_id}: {e}")
-                
-                if previous_message_id:
-                    try:
-                        await message.bot.delete_message(message.chat.id, previous_message_id)
-                        print(f"DEBUG: Успешно удалено предыдущее сообщение с кнопками {previous_message_id}")
-                    except Exception as e:
-                        print(f"DEBUG: Ошибка удаления предыдущего сообщения с кнопками {previous_message_id}: {e}")
-            
-            # Отправляем фото с основной информацией
-            main_message = await message.answer_photo(
-                photo=trainer.photo_id,
-                caption=main_text
-            )
-            
-            # Отправляем описание отдельным сообщением с кнопками
-            about_message = await message.answer(
-                f"<b>О себе:</b>\n{trainer.about}",
-                reply_markup=keyboard
-            )
-            
-            # Сохраняем ID обоих сообщений для последующего удаления
-            if state:
-                # Сначала сохраняем текущие ID как предыдущие (если они есть)
-                data = await state.get_data()
-                current_message_id = data.get('current_message_id')
-                current_main_message_id = data.get('current_main_message_id')
-                
-                # Сохраняем ID предыдущего сообщения (может быть как одиночным, так и разделенным)
-                if current_main_message_id:
-                    # Предыдущее сообщение было разделено на две части
-                    await state.update_data(
-                        previous_message_id=current_message_id,
-                        previous_main_message_id=current_main_message_id
-                    )
-                    print(f"DEBUG: Сохранили предыдущие ID (разделенное) - main: {current_main_message_id}, about: {current_message_id}")
-                elif current_message_id:
-                    # Предыдущее сообщение было одиночным
-                    await state.update_data(
-                        previous_message_id=current_message_id,
-                        previous_main_message_id=None
-                    )
-                    print(f"DEBUG: Сохранили предыдущий ID (одиночное) - about: {current_message_id}")
-                
-                # Теперь сохраняем новые ID как текущие (разделенное сообщение)
-                await state.update_data(
-                    current_message_id=about_message.message_id,
-                    current_main_message_id=main_message.message_id
-                )
-                print(f"DEBUG: Сохранили новые ID (разделенное) - main: {main_message.message_id}, about: {about_message.message_id}")
-        except Exception as e:
-            print(f"Ошибка отправки анкеты тренера {trainer.id}: {e}")
-            # В случае ошибки отправляем все текстом
-            try:
-                sent_message = await message.answer(full_text, reply_markup=keyboard)
-                if state:
-                    await state.update_data(current_message_id=sent_message.message_id)
-            except Exception as e2:
-                print(f"Критическая ошибка отправки анкеты тренера {trainer.id}: {e2}")
-                sent_message = await message.answer(full_text, reply_markup=keyboard)
-                if state:
-                    await state.update_data(current_message_id=sent_message.message_id)
-
-
-def split_text_for_caption(text: str, max_length: int = 4000) -> list[str]:
-    """Разбивает текст на части для отправки в нескольких сообщениях"""
-    if len(text) <= max_length:
-        return [text]
-    
-    parts = []
-    current_part = ""
-    lines = text.split('\n')
-    
-    for line in lines:
-        # Если добавление строки не превысит лимит
-        if len(current_part) + len(line) + 1 <= max_length:
-            if current_part:
-                current_part += '\n' + line
-            else:
-                current_part = line
-        else:
-            # Сохраняем текущую часть и начинаем новую
-            if current_part:
-                parts.append(current_part)
-            current_part = line
-    
-    # Добавляем последнюю часть
-    if current_part:
-        parts.append(current_part)
-    
-    return parts
-
-
-async def send_text_with_photo(message, photo_id: str, text: str, keyboard=None, max_length: int = 4000, should_delete_previous=False):
-    """Отправляет текст с фото, разбивая длинный текст на части"""
-    text_parts = split_text_for_caption(text, max_length)
-    
-    if len(text_parts) == 1:
-        # Короткий текст - отправляем с фото
-        try:
-            if message.photo:
-                await message.edit_media(
-                    media=InputMediaPhoto(media=photo_id, caption=text),
-                    reply_markup=keyboard
-                )
-            else:
-                if should_delete_previous:
-                    await message.delete()
-                await message.answer_photo(
-                    photo=photo_id,
-                    caption=text,
-                    reply_markup=keyboard
-                )
-        except Exception as e:
-            print(f"Ошибка отправки с фото: {e}")
-            # Fallback - отправляем без фото
-            if message.photo and should_delete_previous:
-                await message.delete()
-            await message.answer(text, reply_markup=keyboard)
-    else:
-        # Длинный текст - отправляем частями
-        try:
-            if should_delete_previous:
-                await message.delete()
-            
-            # Отправляем фото с первой частью текста
-            await message.answer_photo(
-                photo=photo_id,
-                caption=text_parts[0],
-                reply_markup=None  # Кнопки только в последнем сообщении
-            )
-            
-            # Отправляем остальные части как обычные сообщения
-            for part in text_parts[1:-1]:
-                await message.answer(part)
-            
-            # Последняя часть с кнопками
-            if text_parts:
-                await message.answer(text_parts[-1], reply_markup=keyboard)
-                
-        except Exception as e:
-            print(f"Ошибка отправки частями: {e}")
-            # Fallback - отправляем все как обычные сообщения
-            if should_delete_previous:
-                await message.delete()
-            
-            for i, part in enumerate(text_parts):
-                if i == len(text_parts) - 1:
-                    # Последняя часть с кнопками
-                    await message.answer(part, reply_markup=keyboard)
-                else:
-                    await message.answer(part)
-
-
-async def format_trainer_card(trainer, current_index: int, total: int) -> str:
-    """Форматирование анкеты тренера"""
-    # Создаем базовый текст без поля "О себе"
-    base_text = (
-        f"<b>{trainer.name}</b>\n"
-        f"Возраст: {trainer.age} лет\n"
-        f"Опыт: {trainer.experience}\n"
-        f"Направление: {trainer.direction}\n\n"
-        f"<b>О себе:</b>\n"
-        f"Анкета {current_index + 1}/{total}"
-    )
-    
-    # Рассчитываем доступное место для описания
-    max_caption_length = 4096
-    available_length = max_caption_length - len(base_text) - 10  # 10 символов запас
-    
-    # Обрезаем описание если нужно
-    about_text = trainer.about
-    if len(about_text) > available_length:
-        about_text = about_text[:available_length] + "..."
-    
-    return (
-        f"<b>{trainer.name}</b>\n"
-        f"Возраст: {trainer.age} лет\n"
-        f"Опыт: {trainer.experience}\n"
-        f"Направление: {trainer.direction}\n\n"
-        f"<b>О себе:</b>\n{about_text}\n\n"
-        f"Анкета {current_index + 1}/{total}"
-    )
-
-
 @router.callback_query(F.data.startswith("client_direction:"))
 async def process_client_direction(callback: CallbackQuery, db: Database, state: FSMContext):
     """Обработчик выбора направления клиентом"""
     direction = callback.data.split(":", 1)[1]
     
-    # Получаем тренеров по направлению
-    trainers = await db.get_approved_trainers_by_direction(direction)
+    # Получаем общий снимок анкет направления
+    snapshot = await db.get_direction_snapshot(direction)
     
-    if not trainers:
+    if not snapshot.trainer_ids:
         # Если сообщение содержит фото, удаляем его и отправляем новое текстовое
         try:
             await callback.message.edit_text(
@@ -319,11 +40,11 @@ async def process_client_direction(callback: CallbackQuery, db: Database, state:
         await callback.answer()
         return
     
-    # Сохраняем в state список тренеров и текущий индекс
+    # В state храним только направление и курсор (позиция и ID анкеты на ней)
     await state.update_data(
         direction=direction,
-        trainers=[t.id for t in trainers],
-        current_index=0
+        cursor=0,
+        cursor_trainer_id=snapshot.trainer_ids[0]
     )
     
     # Показываем первого тренера
@@ -331,13 +52,33 @@ async def process_client_direction(callback: CallbackQuery, db: Database, state:
     await callback.answer()
 
 
-async def show_trainer(message, db: Database, state: FSMContext, user_id: int, should_delete_previous=False):
-    """Показать анкету тренера"""
+def _resolve_cursor(snapshot, data: dict, step: int) -> int:
+    """Позиция анкеты для показа в актуальном снимке направления после сдвига на step"""
+    trainer_ids = snapshot.trainer_ids
+    cursor = data.get("cursor", 0)
+    trainer_id = data.get("cursor_trainer_id")
+    # Снимок мог пересобраться (в том числе в другом процессе),
+    # поэтому курсору верим, только если на его месте та же анкета
+    if not (0 <= cursor < len(trainer_ids) and trainer_ids[cursor] == trainer_id):
+        if trainer_id in trainer_ids:
+            cursor = trainer_ids.index(trainer_id)
+        else:
+            # Анкету убрали: ее место заняла следующая, ее и показываем
+            # при шаге вперед (и на месте), а при шаге назад - предыдущую
+            cursor = min(max(cursor, 0), len(trainer_ids))
+            step = -1 if step < 0 else 0
+    
+    # Циклический переход
+    return (cursor + step) % len(trainer_ids)
+
+
+async def show_trainer(message, db: Database, state: FSMContext, user_id: int, should_delete_previous=False, step: int = 0):
+    """Показать анкету тренера (step - сдвиг курсора перед показом)"""
     data = await state.get_data()
-    trainers_ids = data.get("trainers", [])
-    current_index = data.get("current_index", 0)
+    direction = data.get("direction")
+    snapshot = await db.get_direction_snapshot(direction) if direction else None
     
-    if not trainers_ids:
+    if not snapshot or not snapshot.trainer_ids:
         await message.edit_text(
             "😔 Нет доступных тренеров.\n\n"
             "Выберите другое направление:",
@@ -345,7 +86,14 @@ async def show_trainer(message, db: Database, state: FSMContext, user_id: int, s
         )
         return
     
-    trainer_id = trainers_ids[current_index]
+    total = len(snapshot.trainer_ids)
+    current_index = _resolve_cursor(snapshot, data, step)
+    trainer_id = snapshot.trainer_ids[current_index]
+    await state.update_data(
+        cursor=current_index,
+        cursor_trainer_id=trainer_id
+    )
+    
     trainer = await db.get_trainer_by_id(trainer_id)
     
     if not trainer:
@@ -356,7 +104,7 @@ async def show_trainer(message, db: Database, state: FSMContext, user_id: int, s
     already_liked = await db.check_like_exists(user_id, trainer_id)
     
     keyboard = get_trainer_view_keyboard(
-        trainer_id, current_index, len(trainers_ids), already_liked
+        trainer_id, current_index, total, already_liked
     )
     
     # Используем централизованный сервис для отправки анкеты
@@ -366,64 +114,61 @@ async def show_trainer(message, db: Database, state: FSMContext, user_id: int, s
             trainer=trainer,
             keyboard=keyboard,
             prefix="",
-            status_info=f"Анкета {current_index + 1}/{len(trainers_ids)}",
+            status_info=f"Анкета {current_index + 1}/{total}",
             should_delete_previous=should_delete_previous,
             state=state
         )
     except Exception as e:
         print(f"Ошибка при отправке анкеты: {e}")
         # В случае ошибки отправляем простым сообщением
-        text = f"<b>{trainer.name}</b>\nВозраст: {trainer.age} лет\nОпыт: {trainer.experience}\nНаправление: {trainer.direction}\n\n<b>О себе:</b>\n{trainer.about}\n\nАнкета {current_index + 1}/{len(trainers_ids)}"
+        text = f"<b>{trainer.name}</b>\nВозраст: {trainer.age} лет\nОпыт: {trainer.experience}\nНаправление: {trainer.direction}\n\n<b>О себе:</b>\n{trainer.about}\n\nАнкета {current_index + 1}/{total}"
         await message.answer(text, reply_markup=keyboard)
 
 
 @router.callback_query(F.data.startswith("next:"))
 async def process_next_trainer(callback: CallbackQuery, db: Database, state: FSMContext):
     """Обработчик кнопки 'Следующий'"""
-    data = await state.get_data()
-    trainers_ids = data.get("trainers", [])
-    current_index = data.get("current_index", 0)
-    
-    # Циклический переход
-    new_index = (current_index + 1) % len(trainers_ids)
-    await state.update_data(current_index=new_index)
-    
-    await show_trainer(callback.message, db, state, callback.from_user.id, should_delete_previous=True)
+    await show_trainer(callback.message, db, state, callback.from_user.id, should_delete_previous=True, step=1)
     await callback.answer()
 
 
 @router.callback_query(F.data.startswith("prev:"))
 async def process_prev_trainer(callback: CallbackQuery, db: Database, state: FSMContext):
     """Обработчик кнопки 'Назад'"""
-    data = await state.get_data()
-    trainers_ids = data.get("trainers", [])
-    current_index = data.get("current_index", 0)
-    
-    # Циклический переход
-    new_index = (current_index - 1) % len(trainers_ids)
-    await state.update_data(current_index=new_index)
-    
-    await show_trainer(callback.message, db, state, callback.from_user.id, should_delete_previous=True)
+    await show_trainer(callback.message, db, state, callback.from_user.id, should_delete_previous=True, step=-1)
     await callback.answer()
 
 
 @router.callback_query(F.data.startswith("like:"))
-async def process_like(callback: CallbackQuery, bot: Bot, db: Database, state: FSMContext):
+async def process_like(callback: CallbackQuery, db: Database, state: FSMContext):
     """Обработчик лайка"""
     trainer_id = int(callback.data.split(":", 1)[1])
     client_id = callback.from_user.id
     client_username = callback.from_user.username
     
-    # Проверяем, есть ли уже лайк
-    already_liked = await db.check_like_exists(client_id, trainer_id)
+    # Уведомление тренеру записывается в outbox вместе с лайком
+    # и отправляется в фоне, клиенту отвечаем сразу после записи
+    contact_info = f"@{client_username}" if client_username else f"ID: {client_id}"
+    notification = (
+        f"❤️ <b>У вас новый лайк!</b>\n\n"
+        f"Клиент заинтересовался вашими услугами.\n"
+        f"Контакт: {contact_info}\n\n"
+        f"Свяжитесь с ним для обсуждения деталей!"
+    )
     
-    if already_liked:
+    # Проверка, списание и запись лайка - одна транзакция
+    try:
+        result = await db.spend_like(client_id, client_username, trainer_id, notification=notification)
+    except WriteNotApplied:
+        # База так и не освободилась, транзакция откатилась - лайк не списан
+        await callback.answer("⏳ Не удалось сохранить лайк, попробуйте еще раз. Лайк не списан.", show_alert=True)
+        return
+    
+    if result.status == 'already_liked':
         await callback.answer("Вы уже лайкнули этого тренера!", show_alert=True)
         return
     
-    # Проверяем количество лайков
-    likes_count = await db.get_client_likes(client_id)
-    if likes_count < 1:
+    if result.status == 'no_likes':
         await callback.answer(
             "❌ У вас закончились лайки!\n\n"
             "Используйте кнопку 'Пополнить лайки' для продолжения.",
@@ -431,46 +176,15 @@ async def process_like(callback: CallbackQuery, bot: Bot, db: Database, state: F
         )
         return
     
-    # Уменьшаем количество лайков
-    success = await db.decrease_client_likes(client_id, 1)
-    
-    if not success:
-        await callback.answer("❌ Недостаточно лайков!", show_alert=True)
+    if result.status != 'ok':
+        await callback.answer("❌ Тренер не найден.", show_alert=True)
         return
     
-    # Добавляем лайк
-    like_success = await db.add_like(client_id, client_username, trainer_id)
-    
-    if like_success:
-        # Получаем информацию о тренере
-        trainer = await db.get_trainer_by_id(trainer_id)
-        
-        # Отправляем уведомление тренеру
-        if trainer:
-            contact_info = f"@{client_username}" if client_username else f"ID: {client_id}"
-            try:
-                await bot.send_message(
-                    trainer.user_id,
-                    f"❤️ <b>У вас новый лайк!</b>\n\n"
-                    f"Клиент заинтересовался вашими услугами.\n"
-                    f"Контакт: {contact_info}\n\n"
-                    f"Свяжитесь с ним для обсуждения деталей!"
-                )
-            except Exception:
-                pass  # Если не удалось отправить (например, бот заблокирован)
-        
-        # Получаем новое количество лайков
-        new_likes_count = await db.get_client_likes(client_id)
-        
-        await callback.answer(
-            f"❤️ Лайк отправлен! Тренер получит ваш контакт.\n\n"
-            f"Осталось лайков: {new_likes_count}",
-            show_alert=True
-        )
-    else:
-        # Если не удалось добавить лайк, возвращаем лайк обратно
-        await db.add_client_likes(client_id, 1)
-        await callback.answer("❌ Ошибка при добавлении лайка.", show_alert=True)
+    await callback.answer(
+        f"❤️ Лайк отправлен! Тренер получит ваш контакт.\n\n"
+        f"Осталось лайков: {result.likes_left}",
+        show_alert=True
+    )
 
 
 @router.callback_query(F.data == "already_liked")
@@ -553,15 +267,41 @@ async def process_back_to_main_menu(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
 
 
+# Сколько лайкнутых тренеров показывать на одной странице
+LIKED_PAGE_SIZE = 5
+
+
+async def build_liked_trainers_screen(db: Database, user_id: int, page: int):
+    """
+    Текст и клавиатура страницы лайкнутых тренеров
+    
+    Из базы читаются только ID, имена и направления тренеров страницы и их общее число.
+    Возвращает (text, keyboard, page) или None, если лайков нет.
+    """
+    total = await db.count_client_liked_trainers(user_id)
+    if not total:
+        return None
+    
+    # Список мог сократиться, пока клиент листал
+    page = max(0, min(page, (total - 1) // LIKED_PAGE_SIZE))
+    trainers = await db.get_client_liked_trainers_page(user_id, page, LIKED_PAGE_SIZE)
+    keyboard = get_liked_trainers_keyboard(trainers, page, total, LIKED_PAGE_SIZE)
+    
+    text = f"💖 <b>Ваши лайки</b>\n\n"
+    text += f"Всего лайкнутых тренеров: {total}\n\n"
+    text += "Выберите тренера для просмотра:"
+    return text, keyboard, page
+
+
 @router.callback_query(F.data == "check_likes")
 async def process_check_likes(callback: CallbackQuery, db: Database, state: FSMContext):
     """Обработчик просмотра лайкнутых тренеров"""
     user_id = callback.from_user.id
     
-    # Получаем список лайкнутых тренеров
-    liked_trainers = await db.get_client_liked_trainers(user_id)
+    # Получаем первую страницу лайкнутых тренеров
+    screen = await build_liked_trainers_screen(db, user_id, 0)
     
-    if not liked_trainers:
+    if not screen:
         await callback.answer(
             "😔 У вас пока нет лайкнутых тренеров.\n\n"
             "Начните просматривать анкеты и ставьте лайки интересным тренерам!",
@@ -569,19 +309,10 @@ async def process_check_likes(callback: CallbackQuery, db: Database, state: FSMC
         )
         return
     
-    # Сохраняем список в state для навигации
-    await state.update_data(
-        liked_trainers=[t.id for t in liked_trainers],
-        liked_page=0
-    )
+    text, keyboard, page = screen
     
-    # Показываем список тренеров
-    page = 0
-    keyboard = get_liked_trainers_keyboard(liked_trainers, page)
-    
-    text = f"💖 <b>Ваши лайки</b>\n\n"
-    text += f"Всего лайкнутых тренеров: {len(liked_trainers)}\n\n"
-    text += "Выберите тренера для просмотра:"
+    # Сохраняем страницу в state для возврата к списку
+    await state.update_data(liked_page=page)
     
     try:
         await callback.message.edit_text(text, reply_markup=keyboard)
@@ -597,24 +328,17 @@ async def process_liked_page(callback: CallbackQuery, db: Database, state: FSMCo
     page = int(callback.data.split(":", 1)[1])
     user_id = callback.from_user.id
     
-    # Получаем список лайкнутых тренеров из базы данных
-    liked_trainers = await db.get_client_liked_trainers(user_id)
+    # Получаем нужную страницу лайкнутых тренеров из базы данных
+    screen = await build_liked_trainers_screen(db, user_id, page)
     
-    if not liked_trainers:
+    if not screen:
         await callback.answer("❌ Список тренеров пуст", show_alert=True)
         return
     
-    # Сохраняем список в state для навигации
-    await state.update_data(
-        liked_trainers=[t.id for t in liked_trainers],
-        liked_page=page
-    )
+    text, keyboard, page = screen
     
-    keyboard = get_liked_trainers_keyboard(liked_trainers, page)
-    
-    text = f"💖 <b>Ваши лайки</b>\n\n"
-    text += f"Всего лайкнутых тренеров: {len(liked_trainers)}\n\n"
-    text += "Выберите тренера для просмотра:"
+    # Сохраняем страницу в state для возврата к списку
+    await state.update_data(liked_page=page)
     
     # Если сообщение содержит фото, удаляем его и отправляем новое текстовое
     try:
@@ -626,6 +350,17 @@ async def process_liked_page(callback: CallbackQuery, db: Database, state: FSMCo
     await callback.answer()
 
 
+async def _delete_leftover_messages(callback: CallbackQuery, data: dict):
+    """Удалить сообщения прежней анкеты (previous_*), кроме текущего сообщения"""
+    for message_id in (data.get('previous_message_id'), data.get('previous_main_message_id')):
+        if not message_id or message_id == callback.message.message_id:
+            continue
+        try:
+            await callback.message.bot.delete_message(callback.message.chat.id, message_id)
+        except Exception:
+            pass
+
+
 @router.callback_query(F.data.startswith("view_liked_trainer:"))
 async def process_view_liked_trainer(callback: CallbackQuery, db: Database, state: FSMContext):
     """Обработчик просмотра лайкнутого тренера"""
@@ -636,29 +371,16 @@ async def process_view_liked_trainer(callback: CallbackQuery, db: Database, stat
         await callback.answer("❌ Тренер не найден", show_alert=True)
         return
     
-    # Получаем данные перед очисткой состояния (для удаления предыдущих сообщений)
+    # Удаляем оставшиеся сообщения прежних экранов; текущее сообщение
+    # send_trainer_card отредактирует на месте
     data = await state.get_data()
-    previous_message_id = data.get('previous_message_id') or data.get('current_message_id')
-    previous_main_message_id = data.get('previous_main_message_id') or data.get('current_main_message_id')
-    
-    # Удаляем все предыдущие сообщения если они есть
-    if previous_message_id:
-        try:
-            await callback.message.bot.delete_message(callback.message.chat.id, previous_message_id)
-        except Exception:
-            pass
-    if previous_main_message_id:
-        try:
-            await callback.message.bot.delete_message(callback.message.chat.id, previous_main_message_id)
-        except Exception:
-            pass
+    await _delete_leftover_messages(callback, data)
     
     # Показываем анкету тренера с кнопкой возврата к выбору направления
     keyboard = get_trainer_view_keyboard(
         trainer_id, 0, 1, already_liked=True, from_likes=False
     )
     
-    from services.trainer_card import send_trainer_card
     try:
         await send_trainer_card(
             message=callback.message,
@@ -693,27 +415,16 @@ async def process_back_to_trainers(callback: CallbackQuery, db: Database, state:
     """Обработчик возврата к списку лайкнутых тренеров"""
     user_id = callback.from_user.id
     
-    # Получаем данные перед очисткой состояния (для удаления предыдущих сообщений)
+    # Удаляем оставшиеся сообщения прежних экранов и основную часть
+    # разделенной анкеты; сообщение с кнопками редактируем на месте
     data = await state.get_data()
-    previous_message_id = data.get('previous_message_id') or data.get('current_message_id')
-    previous_main_message_id = data.get('previous_main_message_id') or data.get('current_main_message_id')
-    
-    # Удаляем все предыдущие сообщения если они есть
-    if previous_message_id:
-        try:
-            await callback.message.bot.delete_message(callback.message.chat.id, previous_message_id)
-        except Exception:
-            pass
-    if previous_main_message_id:
-        try:
-            await callback.message.bot.delete_message(callback.message.chat.id, previous_main_message_id)
-        except Exception:
-            pass
+    await _delete_leftover_messages(callback, data)
+    await detach_card_main_part(callback, state)
     
-    # Получаем список лайкнутых тренеров
-    liked_trainers = await db.get_client_liked_trainers(user_id)
+    # Получаем сохраненную страницу лайкнутых тренеров или первую
+    screen = await build_liked_trainers_screen(db, user_id, data.get("liked_page", 0))
     
-    if not liked_trainers:
+    if not screen:
         # Удаляем старое сообщение если оно с фото
         try:
             await callback.message.delete()
@@ -726,29 +437,21 @@ async def process_back_to_trainers(callback: CallbackQuery, db: Database, state:
         await callback.answer()
         return
     
-    # Получаем сохраненную страницу или используем 0
-    page = data.get("liked_page", 0)
+    text, keyboard, page = screen
     
-    # Сохраняем список в state для навигации
+    # Сохраняем страницу в state для навигации
     await state.update_data(
-        liked_trainers=[t.id for t in liked_trainers],
         liked_page=page,
         from_likes=False
     )
     
-    keyboard = get_liked_trainers_keyboard(liked_trainers, page)
-    
-    text = f"💖 <b>Ваши лайки</b>\n\n"
-    text += f"Всего лайкнутых тренеров: {len(liked_trainers)}\n\n"
-    text += "Выберите тренера для просмотра:"
-    
-    # Удаляем старое сообщение если оно с фото
+    # Текст редактируем на месте, сообщение с фото заменяем новым
     try:
-        await callback.message.delete()
+        await callback.message.edit_text(text, reply_markup=keyboard)
     except Exception:
-        pass
-    
-    await callback.message.answer(text, reply_markup=keyboard)
+        if callback.message.photo:
+            await callback.message.delete()
+        await callback.message.answer(text, reply_markup=keyboard)
     await callback.answer()
 
 
@@ -819,11 +522,10 @@ async def process_tariff_selection(callback: CallbackQuery, bot: Bot, db: Databa
         f"<code>/addlikes {'@' + username if username else user_id} {likes_amount}</code>"
     )
     
-    for admin_id in ADMIN_IDS:
-        try:
-            await bot.send_message(admin_id, admin_text)
-        except Exception as e:
-            print(f"Ошибка отправки админу {admin_id}: {e}")
+    async def send_to_admin(admin_id: int):
+        await bot.send_message(admin_id, admin_text)
+    
+    fan_out_in_background(ADMIN_IDS, send_to_admin, "Запрос на пополнение лайков")
     
     await callback.answer()
 
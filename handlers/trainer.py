@@ -9,6 +9,8 @@ from keyboards.inline import get_skip_photo_keyboard, get_moderation_keyboard, g
 from states import TrainerRegistration
 from config import ADMIN_IDS, PLACEMENT_COST, is_admin
 from services.trainer_card import send_trainer_card
+from services.card_renderer import render_trainer_card, STYLE_MODERATION
+from services.fanout import fan_out_in_background
 from messages import get_welcome_message
 
 router = Router()
@@ -201,36 +203,28 @@ async def submit_trainer_profile(message: Message, bot: Bot, state: FSMContext,
     
     # Отправляем анкету всем админам на модерацию
     if ADMIN_IDS:
-        # Создаем основной текст без поля "О себе"
-        main_text = (
-            "🆕 <b>Новая анкета тренера на модерации</b>\n\n"
-            f"<b>Имя:</b> {trainer.name}\n"
-            f"<b>Возраст:</b> {trainer.age} лет\n"
-            f"<b>Опыт:</b> {trainer.experience}\n"
-            f"<b>Направление:</b> {trainer.direction}\n\n"
-            f"<b>Username:</b> @{username if username else 'не указан'}\n"
-            f"<b>User ID:</b> {user_id}"
-        )
+        # Версия сохраненной анкеты здесь неизвестна - карточка собирается без кэша, один раз на всех админов
+        card = render_trainer_card(trainer, STYLE_MODERATION, prefix="🆕 <b>Новая анкета тренера на модерации</b>")
+        main_text, full_text = card.main_text, card.full_text
         
-        # Проверяем, помещается ли основной текст + описание в лимит
-        full_text = main_text + f"\n\n<b>О себе:</b>\n{trainer.about}"
+        keyboard = get_moderation_keyboard(trainer_id)
         
-        for admin_id in ADMIN_IDS:
+        async def send_to_admin(admin_id: int):
             try:
-                if len(full_text) <= 1024:
+                if not card.is_split:
                     # Если помещается - отправляем одним сообщением
                     if trainer.photo_id:
                         await bot.send_photo(
                             admin_id,
                             photo=trainer.photo_id,
                             caption=full_text,
-                            reply_markup=get_moderation_keyboard(trainer_id)
+                            reply_markup=keyboard
                         )
                     else:
                         await bot.send_message(
                             admin_id,
                             full_text,
-                            reply_markup=get_moderation_keyboard(trainer_id)
+                            reply_markup=keyboard
                         )
                 else:
                     # Если не помещается - отправляем основную часть с фото, описание отдельно
@@ -246,20 +240,20 @@ async def submit_trainer_profile(message: Message, bot: Bot, state: FSMContext,
                     # Отправляем описание отдельным сообщением с кнопками
                     await bot.send_message(
                         admin_id,
-                        f"<b>О себе:</b>\n{trainer.about}",
-                        reply_markup=get_moderation_keyboard(trainer_id)
+                        card.about_text,
+                        reply_markup=keyboard
                     )
             except Exception as e:
                 print(f"Ошибка отправки админу {admin_id}: {e}")
                 # В случае ошибки отправляем все текстом
-                try:
-                    await bot.send_message(
-                        admin_id,
-                        full_text,
-                        reply_markup=get_moderation_keyboard(trainer_id)
-                    )
-                except Exception as e2:
-                    print(f"Критическая ошибка отправки админу {admin_id}: {e2}")
+                await bot.send_message(
+                    admin_id,
+                    full_text,
+                    reply_markup=keyboard
+                )
+        
+        # Рассылка идет в фоне - тренер не ждет доставки всем админам
+        fan_out_in_background(ADMIN_IDS, send_to_admin, "Анкета на модерацию")
 
 
 @router.callback_query(F.data.startswith("view_my_profile:"))
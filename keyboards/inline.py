@@ -1,7 +1,7 @@
 """Inline клавиатуры"""
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from typing import List
+from typing import List, Optional
 from config import TRAINING_DIRECTIONS
 
 
@@ -149,6 +149,45 @@ def get_moderation_keyboard(trainer_id: int) -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+def get_moderation_queue_keyboard(trainer_id: int, has_next: bool) -> InlineKeyboardMarkup:
+    """Клавиатура для просмотра очереди модерации по одной анкете"""
+    builder = InlineKeyboardBuilder()
+    builder.row(
+        InlineKeyboardButton(
+            text="✅ Одобрить",
+            callback_data=f"approve:{trainer_id}:queue"
+        ),
+        InlineKeyboardButton(
+            text="❌ Отклонить",
+            callback_data=f"reject:{trainer_id}:queue"
+        )
+    )
+    
+    # Навигация по очереди
+    nav_buttons = [
+        InlineKeyboardButton(
+            text="⬅️ Назад",
+            callback_data=f"mod_prev:{trainer_id}"
+        )
+    ]
+    if has_next:
+        nav_buttons.append(
+            InlineKeyboardButton(
+                text="➡️ Следующая",
+                callback_data=f"mod_next:{trainer_id}"
+            )
+        )
+    builder.row(*nav_buttons)
+    
+    builder.row(
+        InlineKeyboardButton(
+            text="🔙 К статистике",
+            callback_data="admin_stats"
+        )
+    )
+    return builder.as_markup()
+
+
 def get_admin_stats_keyboard() -> InlineKeyboardMarkup:
     """Главное меню статистики для админа"""
     builder = InlineKeyboardBuilder()
@@ -204,36 +243,36 @@ def get_direction_stats_keyboard() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
-def get_trainers_list_keyboard(trainers: List, page: int = 0, per_page: int = 5) -> InlineKeyboardMarkup:
-    """Клавиатура со списком тренеров"""
+def get_trainers_list_keyboard(
+    trainers: List,
+    next_cursor: Optional[str] = None,
+    prev_cursor: Optional[str] = None
+) -> InlineKeyboardMarkup:
+    """Клавиатура со страницей списка тренеров"""
     builder = InlineKeyboardBuilder()
     
-    start = page * per_page
-    end = start + per_page
-    page_trainers = trainers[start:end]
-    
-    for trainer in page_trainers:
+    for trainer in trainers:
         builder.row(
             InlineKeyboardButton(
-                text=f"{trainer.name} ({trainer.direction})",
+                text=f"{trainer.name} ({trainer.direction}) - ❤️ {trainer.likes_count}",
                 callback_data=f"admin_trainer:{trainer.id}"
             )
         )
     
     # Навигация по страницам
     nav_buttons = []
-    if page > 0:
+    if prev_cursor:
         nav_buttons.append(
             InlineKeyboardButton(
                 text="⬅️ Назад",
-                callback_data=f"admin_page:{page-1}"
+                callback_data=f"admin_page_prev:{prev_cursor}"
             )
         )
-    if end < len(trainers):
+    if next_cursor:
         nav_buttons.append(
             InlineKeyboardButton(
                 text="➡️ Вперёд",
-                callback_data=f"admin_page:{page+1}"
+                callback_data=f"admin_page:{next_cursor}"
             )
         )
     if nav_buttons:
@@ -300,9 +339,24 @@ def get_confirm_delete_keyboard(trainer_id: int) -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
-def get_back_to_trainer_keyboard(trainer_id: int) -> InlineKeyboardMarkup:
-    """Клавиатура возврата к анкете тренера"""
+def get_back_to_trainer_keyboard(
+    trainer_id: int,
+    next_cursor: Optional[str] = None,
+    shown: int = 0
+) -> InlineKeyboardMarkup:
+    """
+    Клавиатура возврата к анкете тренера (и перехода к следующей странице лайков)
+    
+    shown - сколько лайков уже показано, чтобы нумерация продолжалась
+    """
     builder = InlineKeyboardBuilder()
+    if next_cursor:
+        builder.row(
+            InlineKeyboardButton(
+                text="➡️ Ещё лайки",
+                callback_data=f"admin_likes:{trainer_id}:{next_cursor}:{shown}"
+            )
+        )
     builder.row(
         InlineKeyboardButton(
             text="🔙 Назад к анкете",
@@ -396,15 +450,13 @@ def get_confirm_delete_my_profile_keyboard(trainer_id: int) -> InlineKeyboardMar
     return builder.as_markup()
 
 
-def get_liked_trainers_keyboard(trainers: List, page: int = 0, per_page: int = 5) -> InlineKeyboardMarkup:
-    """Клавиатура со списком лайкнутых тренеров"""
+def get_liked_trainers_keyboard(trainers: List, page: int, total: int, per_page: int = 5) -> InlineKeyboardMarkup:
+    """Клавиатура со страницей лайкнутых тренеров"""
     builder = InlineKeyboardBuilder()
     
-    start = page * per_page
-    end = start + per_page
-    page_trainers = trainers[start:end]
+    end = (page + 1) * per_page
     
-    for trainer in page_trainers:
+    for trainer in trainers:
         builder.row(
             InlineKeyboardButton(
                 text=f"{trainer.name} ({trainer.direction})",
@@ -421,7 +473,7 @@ def get_liked_trainers_keyboard(trainers: List, page: int = 0, per_page: int = 5
                 callback_data=f"liked_page:{page-1}"
             )
         )
-    if end < len(trainers):
+    if end < total:
         nav_buttons.append(
             InlineKeyboardButton(
                 text="➡️ Вперёд",
@@ -0,0 +1,103 @@
+"""Отрисовка текста анкет тренеров с кэшем по версии анкеты"""
+from dataclasses import dataclass
+from typing import Tuple
+
+from config import TRAINER_CACHE_SIZE
+from database.cache import LRUCache
+from database.models import Trainer
+
+# Максимальная длина подписи к фото в Telegram
+CAPTION_LIMIT = 1024
+
+# Варианты карточки
+STYLE_CLIENT = "client"  # Просмотр клиентом и собственная анкета тренера
+STYLE_MODERATION = "moderation"  # Анкета на модерации у админа
+STYLE_DETAIL = "detail"  # Детали анкеты в админ-панели
+
+# Разделитель между блоками карточки
+SEPARATOR = "\n\n"
+
+
+@dataclass(frozen=True)
+class RenderedCard:
+    """Готовый текст карточки и решение о раскладке"""
+    main_text: str  # Основная часть без поля "О себе"
+    about_text: str  # Поле "О себе"
+    is_split: bool  # Не помещается в подпись к фото - "О себе" отдельным сообщением
+    
+    @property
+    def full_text(self) -> str:
+        return f"{self.main_text}{SEPARATOR}{self.about_text}"
+
+
+# (trainer_id, version, style) -> (тело карточки, "О себе", длина тела + "О себе")
+_parts_cache = LRUCache(TRAINER_CACHE_SIZE)
+
+
+def _render_body(trainer: Trainer, style: str) -> str:
+    """Неизменная для данной версии анкеты часть карточки"""
+    if style == STYLE_CLIENT:
+        return (
+            f"<b>{trainer.name}</b>\n"
+            f"Возраст: {trainer.age} лет\n"
+            f"Опыт: {trainer.experience}\n"
+            f"Направление: {trainer.direction}"
+        )
+    
+    body = (
+        f"<b>Имя:</b> {trainer.name}\n"
+        f"<b>Возраст:</b> {trainer.age} лет\n"
+        f"<b>Опыт:</b> {trainer.experience}\n"
+        f"<b>Направление:</b> {trainer.direction}"
+    )
+    username = f"@{trainer.username if trainer.username else 'не указан'}"
+    if style == STYLE_MODERATION:
+        return body + (
+            f"\n\n<b>Username:</b> {username}\n"
+            f"<b>User ID:</b> {trainer.user_id}"
+        )
+    if style == STYLE_DETAIL:
+        return body + (
+            f"\n<b>Статус:</b> {trainer.status}\n"
+            f"<b>Username:</b> {username}\n"
+            f"<b>User ID:</b> {trainer.user_id}"
+        )
+    raise ValueError(f"Неизвестный вариант карточки: {style}")
+
+
+def _get_parts(trainer: Trainer, style: str) -> Tuple[str, str, int]:
+    """Части карточки из кэша (анкеты без ID, еще не сохраненные, не кэшируются)"""
+    cache_key = (trainer.id, trainer.version, style)
+    parts = _parts_cache.get(cache_key) if trainer.id is not None else None
+    if parts is None:
+        body = _render_body(trainer, style)
+        about_text = f"<b>О себе:</b>\n{trainer.about}"
+        parts = (body, about_text, len(body) + len(SEPARATOR) + len(about_text))
+        if trainer.id is not None:
+            _parts_cache.set(cache_key, parts)
+    return parts
+
+
+def render_trainer_card(trainer: Trainer, style: str = STYLE_CLIENT, prefix: str = "", suffix: str = "") -> RenderedCard:
+    """
+    Собрать карточку анкеты
+    
+    Args:
+        trainer: Объект Trainer
+        style: Вариант карточки (STYLE_*)
+        prefix: Заголовок над карточкой (например, "👤 Ваша анкета")
+        suffix: Изменяемая часть под карточкой ("Анкета i/N", статус)
+    """
+    body, about_text, parts_length = _get_parts(trainer, style)
+    
+    blocks = [block for block in (prefix, body, suffix) if block]
+    main_text = SEPARATOR.join(blocks)
+    
+    # Длина тела и "О себе" посчитана заранее, здесь добавляются только префикс и суффикс
+    full_length = parts_length
+    if prefix:
+        full_length += len(prefix) + len(SEPARATOR)
+    if suffix:
+        full_length += len(suffix) + len(SEPARATOR)
+    
+    return RenderedCard(main_text=main_text, about_text=about_text, is_split=full_length > CAPTION_LIMIT)
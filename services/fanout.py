@@ -0,0 +1,75 @@
+"""Параллельная рассылка нескольким получателям (админам)"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterable, List, Optional, Set
+
+from config import ADMIN_FANOUT_CONCURRENCY
+from services.send_scheduler import send_priority, PRIORITY_NOTIFICATION
+
+logger = logging.getLogger(__name__)
+
+# Рассылки, запущенные в фоне (ссылки держим, чтобы задачи не собрал GC)
+_background_tasks: Set[asyncio.Task] = set()
+
+
+@dataclass
+class FanoutResult:
+    """Результат отправки одному получателю"""
+    recipient: int
+    error: Optional[BaseException] = None
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def fan_out(
+    recipients: Iterable[int],
+    send: Callable[[int], Awaitable[None]],
+    concurrency: int = ADMIN_FANOUT_CONCURRENCY
+) -> List[FanoutResult]:
+    """
+    Вызвать send для каждого получателя, не больше concurrency одновременно
+    
+    Ошибка одного получателя не прерывает рассылку остальным.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    
+    async def deliver(recipient: int) -> FanoutResult:
+        async with semaphore:
+            try:
+                await send(recipient)
+            except Exception as e:
+                return FanoutResult(recipient, e)
+            return FanoutResult(recipient)
+    
+    with send_priority(PRIORITY_NOTIFICATION):
+        return list(await asyncio.gather(*(deliver(recipient) for recipient in recipients)))
+
+
+def fan_out_in_background(
+    recipients: Iterable[int],
+    send: Callable[[int], Awaitable[None]],
+    description: str
+) -> asyncio.Task:
+    """Запустить рассылку отдельной задачей, не дожидаясь отправки"""
+    recipients = list(recipients)
+    
+    async def run():
+        results = await fan_out(recipients, send)
+        for result in results:
+            if not result.ok:
+                logger.warning(f"⚠️ {description}: не удалось отправить {result.recipient}: {result.error}")
+        return results
+    
+    task = asyncio.create_task(run())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def wait_background_fanouts(timeout: float):
+    """Дать незавершенным фоновым рассылкам время закончиться (при остановке бота)"""
+    if _background_tasks:
+        await asyncio.wait(list(_background_tasks), timeout=timeout)
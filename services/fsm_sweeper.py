@@ -0,0 +1,22 @@
+"""Фоновая очистка заброшенных FSM-сессий"""
+import asyncio
+import logging
+from typing import Dict
+
+from database.fsm_storage import SQLiteStorage
+
+logger = logging.getLogger(__name__)
+
+
+async def run_fsm_sweeper(storage: SQLiteStorage, ttls: Dict[str, float], interval: float):
+    """Периодически удалять сессии, простаивающие дольше TTL своей группы"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            evicted, reclaimed = await storage.evict_idle(ttls)
+        except Exception as e:
+            logger.error(f"❌ Ошибка очистки FSM-сессий: {e}")
+            continue
+        
+        if evicted:
+            logger.info(f"🧹 Удалено заброшенных FSM-сессий: {evicted}, освобождено {reclaimed} байт")
@@ -0,0 +1,107 @@
+"""Пакетная работа с FSM-состоянием в рамках одного апдейта"""
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import StateType
+from aiogram.types import TelegramObject
+
+
+# Метка удаленного ключа среди накопленных изменений
+_REMOVED = object()
+
+
+class BufferedFSMContext(FSMContext):
+    """
+    FSMContext, который копит изменения в памяти
+    
+    Данные читаются из хранилища один раз при первом обращении,
+    все изменения за время обработки апдейта записываются одним commit().
+    Запоминаются только ключи, которые обработчик изменил или удалил:
+    при commit() они накладываются на свежие данные из хранилища, чтобы
+    не затереть ключи, записанные параллельным апдейтом того же пользователя.
+    """
+    
+    def __init__(self, context: FSMContext, state: Optional[str]):
+        super().__init__(storage=context.storage, key=context.key)
+        # Состояние уже прочитано FSMContextMiddleware (raw_state)
+        self._state = state
+        self._data: Optional[Dict[str, Any]] = None
+        self._state_changed = False
+        # Измененные ключи (_REMOVED - удаленные) и признак clear()
+        self._changes: Dict[str, Any] = {}
+        self._cleared = False
+    
+    async def _load_data(self) -> Dict[str, Any]:
+        if self._data is None:
+            self._data = await self.storage.get_data(key=self.key)
+        return self._data
+    
+    async def set_state(self, state: StateType = None) -> None:
+        self._state = state.state if isinstance(state, State) else state
+        self._state_changed = True
+    
+    async def get_state(self) -> Optional[str]:
+        return self._state
+    
+    async def set_data(self, data: Dict[str, Any]) -> None:
+        current_data = await self._load_data()
+        for key in current_data.keys() - data.keys():
+            self._changes[key] = _REMOVED
+        self._changes.update(data)
+        self._data = data.copy()
+    
+    async def get_data(self) -> Dict[str, Any]:
+        return (await self._load_data()).copy()
+    
+    async def update_data(
+        self, data: Optional[Dict[str, Any]] = None, **kwargs: Any
+    ) -> Dict[str, Any]:
+        if data:
+            kwargs.update(data)
+        current_data = await self._load_data()
+        current_data.update(kwargs)
+        self._changes.update(kwargs)
+        return current_data.copy()
+    
+    async def clear(self) -> None:
+        self._state = None
+        self._data = {}
+        self._state_changed = True
+        self._changes = {}
+        self._cleared = True
+    
+    async def commit(self) -> None:
+        """Наложить накопленные изменения на текущие данные в хранилище"""
+        if self._state_changed:
+            await self.storage.set_state(key=self.key, state=self._state)
+            self._state_changed = False
+        if self._cleared or self._changes:
+            data = {} if self._cleared else await self.storage.get_data(key=self.key)
+            for key, value in self._changes.items():
+                if value is _REMOVED:
+                    data.pop(key, None)
+                else:
+                    data[key] = value
+            await self.storage.set_data(key=self.key, data=data)
+            self._changes = {}
+            self._cleared = False
+
+
+async def fsm_transaction_middleware(
+    handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+    event: TelegramObject,
+    data: Dict[str, Any]
+) -> Any:
+    """Middleware: одна транзакция FSM-состояния на обработку апдейта"""
+    context = data.get('state')
+    if context is None:
+        return await handler(event, data)
+    
+    buffered = BufferedFSMContext(context, data.get('raw_state'))
+    data['state'] = buffered
+    try:
+        return await handler(event, data)
+    finally:
+        # Изменения сохраняются и при ошибке - как и при прямой записи
+        await buffered.commit()
@@ -0,0 +1,74 @@
+"""Фоновая отправка уведомлений из outbox"""
+import asyncio
+import logging
+import time
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+
+from database import Database
+from services.send_scheduler import send_priority, PRIORITY_NOTIFICATION
+
+logger = logging.getLogger(__name__)
+
+
+def _retry_delay(attempts: int, base_delay: float, max_delay: float) -> float:
+    """Экспоненциальная пауза перед повторной попыткой"""
+    return min(max_delay, base_delay * 2 ** attempts)
+
+
+async def _drain_batch(bot: Bot, db: Database, batch_size: int, max_attempts: int, base_delay: float, max_delay: float) -> int:
+    """Отправить одну пачку готовых уведомлений. Возвращает ее размер"""
+    messages = await db.get_due_outbox(batch_size)
+    
+    with send_priority(PRIORITY_NOTIFICATION):
+        for message in messages:
+            try:
+                await bot.send_message(message.chat_id, message.text)
+            except (TelegramForbiddenError, TelegramBadRequest) as e:
+                # Бот заблокирован или чат недоступен - повтор не поможет
+                logger.warning(f"⚠️ Уведомление {message.id} не доставлено в чат {message.chat_id}: {e}")
+                await db.fail_outbox(message.id, str(e))
+                continue
+            except Exception as e:
+                if message.attempts + 1 >= max_attempts:
+                    logger.warning(f"⚠️ Уведомление {message.id} не доставлено после {max_attempts} попыток: {e}")
+                    await db.fail_outbox(message.id, str(e))
+                else:
+                    delay = _retry_delay(message.attempts, base_delay, max_delay)
+                    await db.reschedule_outbox(message.id, time.time() + delay, str(e))
+                continue
+            await db.delete_outbox(message.id)
+    
+    return len(messages)
+
+
+async def run_outbox_worker(
+    bot: Bot,
+    db: Database,
+    poll_interval: float,
+    batch_size: int,
+    max_attempts: int,
+    base_delay: float = 5.0,
+    max_delay: float = 600.0
+):
+    """Отправлять накопившиеся уведомления, пока бот работает"""
+    while True:
+        db.outbox_event.clear()
+        timeout = poll_interval
+        try:
+            sent = await _drain_batch(bot, db, batch_size, max_attempts, base_delay, max_delay)
+            # Полная пачка - вероятно, готовы еще уведомления
+            if sent >= batch_size:
+                continue
+            
+            next_attempt_at = await db.get_next_outbox_time()
+            if next_attempt_at is not None:
+                timeout = min(timeout, max(0.0, next_attempt_at - time.time()))
+        except Exception as e:
+            logger.error(f"❌ Ошибка обработки outbox: {e}")
+        
+        try:
+            await asyncio.wait_for(db.outbox_event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,255 @@
+"""Планировщик исходящих запросов к Bot API с учетом лимитов Telegram"""
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Deque, Dict, Optional, Tuple
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.exceptions import TelegramRetryAfter
+
+logger = logging.getLogger(__name__)
+
+# Классы приоритета: чем меньше число, тем раньше уходит запрос
+PRIORITY_INTERACTIVE = 0  # Ответы пользователю, который сейчас нажал кнопку
+PRIORITY_NOTIFICATION = 1  # Уведомления другим пользователям и рассылки админам
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_NOTIFICATION)
+
+_current_priority: ContextVar[int] = ContextVar("send_priority", default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def send_priority(priority: int):
+    """Отправлять запросы внутри блока с указанным приоритетом"""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class TokenBucket:
+    """Корзина токенов: rate токенов в секунду, не больше capacity за раз"""
+    
+    __slots__ = ("rate", "capacity", "tokens", "updated", "blocked_until")
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+    
+    def _refill(self, now: float):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+    
+    def wait_time(self, now: float) -> float:
+        """Через сколько секунд можно будет взять токен"""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+    
+    def take(self, now: float):
+        self._refill(now)
+        self.tokens -= 1
+    
+    def block(self, seconds: float):
+        """Не выдавать токены ближайшие seconds секунд (ответ retry_after)"""
+        now = time.monotonic()
+        self.blocked_until = max(self.blocked_until, now + seconds)
+        # После паузы доступен ровно один запрос, дальше - с обычной скоростью
+        self.tokens = 1
+        self.updated = self.blocked_until
+    
+    def is_idle(self, now: float) -> bool:
+        """Корзина полная и не заблокирована - ее можно выбросить"""
+        self._refill(now)
+        return now >= self.blocked_until and self.tokens >= self.capacity
+
+
+@dataclass
+class SchedulerStats:
+    """Метрики очереди исходящих запросов"""
+    queued: Dict[int, int]  # Текущая глубина очереди по приоритетам
+    max_queued: int  # Наибольшая глубина очереди за время работы
+    sent: int  # Выдано разрешений на отправку
+    retries: int  # Повторов после retry_after
+    failed: int  # Отказов после исчерпания повторов
+    total_wait: float  # Суммарное время ожидания в очереди (секунды)
+    
+    @property
+    def avg_wait(self) -> float:
+        return self.total_wait / self.sent if self.sent else 0.0
+
+
+class SendScheduler(BaseRequestMiddleware):
+    """
+    Middleware сессии бота: все запросы к конкретному чату проходят через
+    общую очередь с глобальной и початовой корзинами токенов
+    
+    Запросы без chat_id (getUpdates, answerCallbackQuery) не ограничиваются,
+    но на retry_after повторяются так же.
+    """
+    
+    # Сколько початовых корзин держать, прежде чем выбрасывать простаивающие
+    MAX_CHAT_BUCKETS = 10000
+    
+    def __init__(
+        self,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        chat_burst: float = 3.0,
+        max_retries: int = 3
+    ):
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self._global = TokenBucket(global_rate, global_rate)
+        self._chats: Dict[int, TokenBucket] = {}
+        self._queues: Dict[int, Deque[Tuple[object, asyncio.Future, float]]] = {
+            priority: deque() for priority in PRIORITIES
+        }
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.max_queued = 0
+        self.sent = 0
+        self.retries = 0
+        self.failed = 0
+        self.total_wait = 0.0
+    
+    async def __call__(self, make_request, bot, method):
+        chat_id = getattr(method, "chat_id", None)
+        attempt = 0
+        while True:
+            if chat_id is not None:
+                await self._acquire(chat_id)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if attempt >= self.max_retries:
+                    self.failed += 1
+                    raise
+                attempt += 1
+                self.retries += 1
+                logger.warning(
+                    f"⏳ Лимит Telegram для {type(method).__name__} (чат {chat_id}): "
+                    f"повтор {attempt}/{self.max_retries} через {e.retry_after} с"
+                )
+                if chat_id is not None:
+                    self._bucket(chat_id).block(e.retry_after)
+                else:
+                    await asyncio.sleep(e.retry_after)
+    
+    def queue_depth(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+    
+    def stats(self) -> SchedulerStats:
+        return SchedulerStats(
+            queued={priority: len(queue) for priority, queue in self._queues.items()},
+            max_queued=self.max_queued,
+            sent=self.sent,
+            retries=self.retries,
+            failed=self.failed,
+            total_wait=self.total_wait
+        )
+    
+    async def close(self):
+        """Остановить планировщик; ожидающие запросы получают CancelledError"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for queue in self._queues.values():
+            while queue:
+                _, future, _ = queue.popleft()
+                future.cancel()
+    
+    def _bucket(self, chat_id) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= self.MAX_CHAT_BUCKETS:
+                self._prune_buckets()
+            bucket = self._chats[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+        return bucket
+    
+    def _prune_buckets(self):
+        now = time.monotonic()
+        for chat_id in [chat_id for chat_id, bucket in self._chats.items() if bucket.is_idle(now)]:
+            del self._chats[chat_id]
+    
+    async def _acquire(self, chat_id):
+        """Дождаться своей очереди на отправку в чат"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        
+        future = asyncio.get_running_loop().create_future()
+        self._queues[_current_priority.get()].append((chat_id, future, time.monotonic()))
+        self.max_queued = max(self.max_queued, self.queue_depth())
+        self._wakeup.set()
+        await future
+    
+    async def _run(self):
+        """Выдавать разрешения на отправку в порядке приоритета"""
+        while True:
+            if not self.queue_depth():
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            
+            now = time.monotonic()
+            delay = self._global.wait_time(now)
+            if delay <= 0:
+                delay = self._grant_next(now)
+                if delay is None:
+                    continue
+            
+            # Новый запрос в другой чат может оказаться готовым раньше
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+    
+    def _grant_next(self, now: float) -> Optional[float]:
+        """
+        Разрешить отправку первому запросу, чей чат не исчерпал лимит
+        
+        Возвращает None, если разрешение выдано, иначе время до ближайшего
+        готового чата.
+        """
+        min_delay = None
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            blocked = set()
+            for index, (chat_id, future, enqueued_at) in enumerate(queue):
+                if future.done():
+                    # Ожидающий отменен - просто убираем из очереди
+                    del queue[index]
+                    return None
+                if chat_id in blocked:
+                    continue
+                delay = self._bucket(chat_id).wait_time(now)
+                if delay > 0:
+                    blocked.add(chat_id)
+                    min_delay = delay if min_delay is None else min(min_delay, delay)
+                    continue
+                
+                del queue[index]
+                self._bucket(chat_id).take(now)
+                self._global.take(now)
+                self.sent += 1
+                self.total_wait += now - enqueued_at
+                future.set_result(None)
+                return None
+        return min_delay
@@ -1,21 +1,38 @@
 """Сервис для отправки анкет тренеров"""
+from typing import Optional, Tuple
+
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.types import Message, CallbackQuery, InputMediaPhoto
 from aiogram.fsm.context import FSMContext
 from database.models import Trainer
+from services.card_renderer import render_trainer_card, STYLE_CLIENT
+
+# Раскладки карточки: одно сообщение с фото / текстом,
+# либо основная часть (фото или текст) + отдельное сообщение "О себе" с кнопками
+LAYOUT_PHOTO = "photo"
+LAYOUT_TEXT = "text"
+LAYOUT_SPLIT_PHOTO = "split_photo"
+LAYOUT_SPLIT_TEXT = "split_text"
+SPLIT_LAYOUTS = (LAYOUT_SPLIT_PHOTO, LAYOUT_SPLIT_TEXT)
 
 
 async def send_trainer_card(
-    message, 
-    trainer: Trainer, 
+    message,
+    trainer: Trainer,
     keyboard,
     prefix: str = "",
     status_info: str = None,
     should_delete_previous: bool = False,
-    state: FSMContext = None
+    state: FSMContext = None,
+    style: str = STYLE_CLIENT
 ):
     """
     Универсальная функция для отправки анкеты тренера
     
+    Если раскладка карточки не меняется, текущее сообщение редактируется
+    на месте (один вызов Bot API). Заново карточка отправляется, только когда
+    меняется раскладка (одно сообщение / разделенное, с фото / без фото).
+    
     Args:
         message: Объект Message или CallbackQuery
         trainer: Объект Trainer
@@ -24,246 +41,183 @@ async def send_trainer_card(
         status_info: Дополнительная информация о статусе
         should_delete_previous: Удалять ли предыдущие сообщения
         state: Контекст состояния для клиентов (для отслеживания ID сообщений)
+        style: Вариант карточки (клиентская или для модерации)
     """
-    # Определяем, является ли текущее сообщение фото
-    # Для CallbackQuery нужно проверить message.photo
-    is_photo = False
-    if hasattr(message, 'photo'):
-        is_photo = bool(message.photo)
-    elif hasattr(message, 'message') and hasattr(message.message, 'photo'):
-        is_photo = bool(message.message.photo)
+    # Для CallbackQuery работаем с сообщением, к которому привязаны кнопки
+    target = message.message if isinstance(message, CallbackQuery) else message
     
-    # Создаем основной текст без поля "О себе"
-    if prefix:
-        main_text = f"{prefix}\n\n"
+    card = render_trainer_card(trainer, style, prefix=prefix, suffix=status_info or "")
+    main_text, about_text, full_text = card.main_text, card.about_text, card.full_text
+    
+    if not card.is_split:
+        layout = LAYOUT_PHOTO if trainer.photo_id else LAYOUT_TEXT
     else:
-        main_text = ""
+        layout = LAYOUT_SPLIT_PHOTO if trainer.photo_id else LAYOUT_SPLIT_TEXT
     
-    main_text += (
-        f"<b>{trainer.name}</b>\n"
-        f"Возраст: {trainer.age} лет\n"
-        f"Опыт: {trainer.experience}\n"
-        f"Направление: {trainer.direction}"
-    )
+    data = await state.get_data() if state else {}
+    current_layout = _current_layout(target, data)
     
-    if status_info:
-        main_text += f"\n\n{status_info}"
+    message_ids = None
+    if layout == current_layout:
+        message_ids = await _edit_card(
+            target, trainer, layout, main_text, about_text, full_text, keyboard,
+            data.get('current_main_message_id')
+        )
     
-    # Проверяем, помещается ли основной текст + описание в лимит
-    full_text = main_text + f"\n\n<b>О себе:</b>\n{trainer.about}"
+    if message_ids is None:
+        # Раскладка поменялась или редактирование не удалось - отправляем заново
+        if should_delete_previous or target.photo or current_layout in SPLIT_LAYOUTS:
+            main_message_id = data.get('current_main_message_id') if current_layout in SPLIT_LAYOUTS else None
+            await _delete_messages(target, target.message_id, main_message_id)
+        message_ids = await _send_card(target, trainer, layout, main_text, about_text, full_text, keyboard)
     
-    if len(full_text) <= 1024:
-        # Если помещается - отправляем одним сообщением
-        await _send_single_message(message, trainer, full_text, keyboard, should_delete_previous, is_photo, state)
-    else:
-        # Если не помещается - отправляем основную часть с фото, описание отдельно
-        await _send_split_message(message, trainer, main_text, keyboard, should_delete_previous, is_photo, state)
+    # Сохраняем ID сообщений карточки для следующего редактирования или удаления
+    if state and message_ids:
+        current_message_id, current_main_message_id = message_ids
+        await state.update_data(
+            current_message_id=current_message_id,
+            current_main_message_id=current_main_message_id,
+            card_layout=layout
+        )
 
 
-async def _send_single_message(
-    message, 
-    trainer: Trainer, 
-    text: str, 
-    keyboard, 
-    should_delete_previous: bool, 
-    is_photo: bool,
-    state: FSMContext
-):
-    """Отправка одиночного сообщения"""
+async def delete_trainer_card(message, state: FSMContext):
+    """Удалить показанную карточку вместе с основной частью разделенной анкеты"""
+    target = message.message if isinstance(message, CallbackQuery) else message
+    data = await state.get_data()
+    main_message_id = None
+    if _current_layout(target, data) in SPLIT_LAYOUTS:
+        main_message_id = data.get('current_main_message_id')
+    await _delete_messages(target, target.message_id, main_message_id)
+
+
+async def detach_card_main_part(message, state: FSMContext):
+    """
+    Удалить основную часть разделенной карточки, оставив сообщение с кнопками,
+    чтобы отредактировать его на месте под другой экран
+    """
+    target = message.message if isinstance(message, CallbackQuery) else message
+    data = await state.get_data()
+    if _current_layout(target, data) in SPLIT_LAYOUTS:
+        await _delete_messages(target, data.get('current_main_message_id'))
+    await state.update_data(current_main_message_id=None)
+
+
+def _current_layout(target: Message, data: dict) -> Optional[str]:
+    """Раскладка карточки, которую показывает сообщение с кнопками"""
+    if data.get('current_main_message_id') and data.get('current_message_id') == target.message_id:
+        return data.get('card_layout')
+    if target.photo:
+        return LAYOUT_PHOTO
+    if target.text:
+        return LAYOUT_TEXT
+    return None
+
+
+async def _edit_card(
+    target: Message,
+    trainer: Trainer,
+    layout: str,
+    main_text: str,
+    about_text: str,
+    full_text: str,
+    keyboard,
+    main_message_id: Optional[int]
+) -> Optional[Tuple[int, Optional[int]]]:
+    """Отредактировать карточку на месте. Возвращает ID сообщений или None"""
     try:
-        # Определяем правильный объект для отправки сообщения
-        message_to_send = message if not hasattr(message, 'message') else message.message
-        
-        # Если есть фото, отправляем с фото
-        if trainer.photo_id:
-            # Для callback с фото сначала удаляем старое сообщение
-            if is_photo and hasattr(message, 'message'):
-                try:
-                    await message.message.delete()
-                except:
-                    pass
-            
-            # Удаляем предыдущие сообщения если нужно
-            if should_delete_previous:
-                if state:
-                    data = await state.get_data()
-                    previous_message_id = data.get('previous_message_id')
-                    previous_main_message_id = data.get('previous_main_message_id')
-                    
-                    await _delete_previous_messages(message, previous_main_message_id, previous_message_id)
-            
-            # Отправляем новое фото
-            sent_message = await message_to_send.answer_photo(
-                photo=trainer.photo_id,
-                caption=text,
+        if layout == LAYOUT_PHOTO:
+            await _ignore_not_modified(target.edit_media(
+                media=InputMediaPhoto(media=trainer.photo_id, caption=full_text),
                 reply_markup=keyboard
-            )
-            
-            # Сохраняем ID сообщения для последующего удаления
-            if state:
-                current_message_id = sent_message.message_id
-                current_main_message_id = None
-                await state.update_data(
-                    current_message_id=current_message_id,
-                    current_main_message_id=current_main_message_id
-                )
-                print(f"DEBUG: Сохранили ID одиночного сообщения с фото: {current_message_id}")
+            ))
+            return target.message_id, None
+        
+        if layout == LAYOUT_TEXT:
+            await _ignore_not_modified(target.edit_text(full_text, reply_markup=keyboard))
+            return target.message_id, None
+        
+        # Разделенная карточка: основная часть и "О себе" с кнопками
+        if layout == LAYOUT_SPLIT_PHOTO:
+            await _ignore_not_modified(target.bot.edit_message_media(
+                chat_id=target.chat.id,
+                message_id=main_message_id,
+                media=InputMediaPhoto(media=trainer.photo_id, caption=main_text)
+            ))
         else:
-            # Без фото - удаляем старое сообщение если оно было с фото
-            if is_photo:
-                try:
-                    # Если это callback, пробуем удалить через message
-                    if hasattr(message, 'message'):
-                        await message.message.delete()
-                    else:
-                        await message.delete()
-                except:
-                    pass
-            
-            # Удаляем предыдущие сообщения если нужно
-            if should_delete_previous:
-                if state:
-                    data = await state.get_data()
-                    previous_message_id = data.get('previous_message_id')
-                    previous_main_message_id = data.get('previous_main_message_id')
-                    
-                    await _delete_previous_messages(message, previous_main_message_id, previous_message_id)
-            
-            # Используем answer для отправки текста
-            sent_message = await message_to_send.answer(text, reply_markup=keyboard)
-            
-            # Сохраняем ID сообщения для последующего удаления
-            if state:
-                current_message_id = sent_message.message_id
-                current_main_message_id = None
-                await state.update_data(
-                    current_message_id=current_message_id,
-                    current_main_message_id=current_main_message_id
-                )
-                print(f"DEBUG: Сохранили ID одиночного сообщения без фото: {current_message_id}")
+            await _ignore_not_modified(target.bot.edit_message_text(
+                chat_id=target.chat.id,
+                message_id=main_message_id,
+                text=main_text
+            ))
+        await _ignore_not_modified(target.edit_text(about_text, reply_markup=keyboard))
+        return target.message_id, main_message_id
     except Exception as e:
-        print(f"Ошибка при отправке одиночного сообщения: {e}")
-        # Fallback - отправляем без фото
-        try:
-            message_to_send = message if not hasattr(message, 'message') else message.message
-            sent_message = await message_to_send.answer(text, reply_markup=keyboard)
-            if state:
-                await state.update_data(current_message_id=sent_message.message_id)
-        except Exception as e2:
-            print(f"Критическая ошибка: {e2}")
+        print(f"Не удалось отредактировать анкету {trainer.id} на месте: {e}")
+        return None
 
 
-async def _send_split_message(
-    message, 
-    trainer: Trainer, 
-    main_text: str, 
-    keyboard, 
-    should_delete_previous: bool, 
-    is_photo: bool,
-    state: FSMContext
-):
-    """Отправка разделенного сообщения (фото + описание)"""
+async def _ignore_not_modified(request):
+    """Выполнить редактирование, считая неизмененное сообщение успехом"""
+    try:
+        return await request
+    except TelegramBadRequest as e:
+        if "message is not modified" not in str(e):
+            raise
+
+
+async def _send_card(
+    target: Message,
+    trainer: Trainer,
+    layout: str,
+    main_text: str,
+    about_text: str,
+    full_text: str,
+    keyboard
+) -> Optional[Tuple[int, Optional[int]]]:
+    """Отправить карточку новыми сообщениями. Возвращает ID сообщений"""
     try:
-        # Определяем правильный объект для отправки сообщения
-        message_to_send = message if not hasattr(message, 'message') else message.message
+        if layout == LAYOUT_PHOTO:
+            sent_message = await target.answer_photo(
+                photo=trainer.photo_id,
+                caption=full_text,
+                reply_markup=keyboard
+            )
+            return sent_message.message_id, None
         
-        # Удаляем предыдущие сообщения если нужно
-        if should_delete_previous and state:
-            data = await state.get_data()
-            previous_message_id = data.get('previous_message_id')
-            previous_main_message_id = data.get('previous_main_message_id')
-            
-            await _delete_previous_messages(message, previous_main_message_id, previous_message_id)
+        if layout == LAYOUT_TEXT:
+            sent_message = await target.answer(full_text, reply_markup=keyboard)
+            return sent_message.message_id, None
         
         # Отправляем основную часть с фото (если есть)
-        if trainer.photo_id:
-            main_message = await message_to_send.answer_photo(
+        if layout == LAYOUT_SPLIT_PHOTO:
+            main_message = await target.answer_photo(
                 photo=trainer.photo_id,
                 caption=main_text
             )
         else:
-            main_message = await message_to_send.answer(main_text)
+            main_message = await target.answer(main_text)
         
         # Отправляем описание отдельным сообщением с кнопками
-        about_message = await message_to_send.answer(
-            f"<b>О себе:</b>\n{trainer.about}",
-            reply_markup=keyboard
-        )
-        
-        # Сохраняем ID обоих сообщений для последующего удаления
-        if state:
-            # Сначала сохраняем текущие ID как предыдущие (если они есть)
-            data = await state.get_data()
-            current_message_id = data.get('current_message_id')
-            current_main_message_id = data.get('current_main_message_id')
-            
-            # Сохраняем ID предыдущего сообщения (может быть как одиночным, так и разделенным)
-            if current_main_message_id:
-                # Предыдущее сообщение было разделено на две части
-                await state.update_data(
-                    previous_message_id=current_message_id,
-                    previous_main_message_id=current_main_message_id
-                )
-                print(f"DEBUG: Сохранили предыдущие ID (разделенное) - main: {current_main_message_id}, about: {current_message_id}")
-            elif current_message_id:
-                # Предыдущее сообщение было одиночным
-                await state.update_data(
-                    previous_message_id=current_message_id,
-                    previous_main_message_id=None
-                )
-                print(f"DEBUG: Сохранили предыдущий ID (одиночное) - about: {current_message_id}")
-            
-            # Теперь сохраняем новые ID как текущие (разделенное сообщение)
-            await state.update_data(
-                current_message_id=about_message.message_id,
-                current_main_message_id=main_message.message_id
-            )
-            print(f"DEBUG: Сохранили новые ID (разделенное) - main: {main_message.message_id}, about: {about_message.message_id}")
+        about_message = await target.answer(about_text, reply_markup=keyboard)
+        return about_message.message_id, main_message.message_id
     except Exception as e:
-        print(f"Ошибка при отправке разделенного сообщения: {e}")
+        print(f"Ошибка при отправке анкеты {trainer.id}: {e}")
         # Fallback - отправляем все текстом
         try:
-            message_to_send = message if not hasattr(message, 'message') else message.message
-            sent_message = await message_to_send.answer(
-                f"{main_text}\n\n<b>О себе:</b>\n{trainer.about}",
-                reply_markup=keyboard
-            )
-            if state:
-                await state.update_data(current_message_id=sent_message.message_id)
+            sent_message = await target.answer(full_text, reply_markup=keyboard)
+            return sent_message.message_id, None
         except Exception as e2:
             print(f"Критическая ошибка: {e2}")
+            return None
 
 
-async def _delete_previous_messages(message, previous_main_message_id, previous_message_id):
-    """Удаляет предыдущие сообщения если они существуют"""
-    print(f"DEBUG: Удаляем предыдущие сообщения - main: {previous_main_message_id}, about: {previous_message_id}")
-    
-    # Определяем правильный bot объект
-    bot = None
-    chat_id = None
-    
-    if hasattr(message, 'bot'):
-        bot = message.bot
-        chat_id = message.chat.id
-    elif hasattr(message, 'message'):
-        bot = message.message.bot
-        chat_id = message.message.chat.id
-    
-    if not bot:
-        print("DEBUG: Не удалось определить bot объект")
-        return
-    
-    if previous_main_message_id:
+async def _delete_messages(target: Message, *message_ids: Optional[int]):
+    """Удаляет сообщения прежней карточки, если они существуют"""
+    for message_id in message_ids:
+        if not message_id:
+            continue
         try:
-            await bot.delete_message(chat_id, previous_main_message_id)
-            print(f"DEBUG: Успешно удалено предыдущее основное сообщение {previous_main_message_id}")
+            await target.bot.delete_message(target.chat.id, message_id)
         except Exception as e:
-            print(f"DEBUG: Ошибка удаления предыдущего основного сообщения {previous_main_message_id}: {e}")
-    
-    if previous_message_id:
-        try:
-            await bot.delete_message(chat_id, previous_message_id)
-            print(f"DEBUG: Успешно удалено предыдущее сообщение с кнопками {previous_message_id}")
-        except Exception as e:
-            print(f"DEBUG: Ошибка удаления предыдущего сообщения с кнопками {previous_message_id}: {e}")
-
+            print(f"DEBUG: Ошибка удаления сообщения {message_id}: {e}")
@@ -0,0 +1,111 @@
+"""Получение апдейтов через webhook: встроенный aiohttp-сервер"""
+import asyncio
+import ipaddress
+import logging
+import signal
+from typing import Any, Optional
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# Telegram принимает max_connections от 1 до 100
+MAX_TELEGRAM_CONNECTIONS = 100
+
+
+def is_loopback_host(host: str) -> bool:
+    """Сервер на этом адресе доступен только с той же машины"""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class LimitedRequestHandler(SimpleRequestHandler):
+    """
+    Обработчик webhook: отвечает Telegram сразу, а апдейт обрабатывает
+    в фоне, не больше concurrency апдейтов одновременно
+    
+    Когда все места заняты, ответ на новый запрос задерживается - отправитель
+    сам притормаживает, а очередь задач в памяти не растет.
+    """
+    
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        concurrency: int,
+        secret_token: Optional[str] = None,
+        **data: Any
+    ):
+        super().__init__(dispatcher, bot, handle_in_background=True, secret_token=secret_token, **data)
+        self._slots = asyncio.Semaphore(max(1, concurrency))
+    
+    async def _handle_request_background(self, bot: Bot, request: web.Request) -> web.Response:
+        update = await request.json(loads=bot.session.json_loads)
+        await self._slots.acquire()
+        task = asyncio.create_task(self._background_feed_update(bot=bot, update=update))
+        # Место освобождается и тогда, когда задачу отменили до начала обработки
+        task.add_done_callback(lambda _: self._slots.release())
+        self._background_feed_update_tasks.add(task)
+        task.add_done_callback(self._background_feed_update_tasks.discard)
+        return web.json_response({}, dumps=bot.session.json_dumps)
+    
+    async def close(self):
+        """Дождаться апдейтов в обработке (сессию бота закрывает bot.py)"""
+        if self._background_feed_update_tasks:
+            await asyncio.wait(list(self._background_feed_update_tasks), timeout=10)
+
+
+async def run_webhook(
+    dp: Dispatcher,
+    bot: Bot,
+    host: str,
+    port: int,
+    path: str,
+    secret_token: Optional[str],
+    concurrency: int,
+    url: Optional[str] = None
+):
+    """
+    Принимать апдейты на http://host:port/path, пока задачу не отменят
+    
+    Если задан url, он регистрируется в Telegram через setWebhook; без него
+    апдейты присылает локальный прокси или другой отправитель.
+    """
+    app = web.Application()
+    handler = LimitedRequestHandler(dp, bot, concurrency, secret_token=secret_token)
+    handler.register(app, path=path)
+    setup_application(app, dp, bot=bot)
+    
+    runner = web.AppRunner(app)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, host, port).start()
+        logger.info(f"🌐 Webhook-сервер слушает {host}:{port}{path}, одновременно апдейтов: {concurrency}")
+        
+        if url:
+            await bot.set_webhook(
+                url,
+                secret_token=secret_token,
+                max_connections=min(MAX_TELEGRAM_CONNECTIONS, max(1, concurrency)),
+                allowed_updates=dp.resolve_used_update_types()
+            )
+            logger.info(f"✅ Webhook зарегистрирован: {url}")
+        
+        # Останавливаемся по SIGTERM/SIGINT, как start_polling
+        stopped = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stopped.set)
+        try:
+            await stopped.wait()
+        finally:
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                loop.remove_signal_handler(sig)
+    finally:
+        await runner.cleanup()
@@ -0,0 +1,329 @@
+"""Режим супервизора: апдейты обрабатывают несколько процессов-воркеров"""
+import asyncio
+import logging
+import multiprocessing
+import pickle
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing.connection import Connection
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+
+from database.writer import WriteOperation, WriterStats
+
+logger = logging.getLogger(__name__)
+
+# Сообщения по каналу: (вид, данные...)
+MESSAGE_UPDATE = "update"  # Супервизор -> воркер: сырой апдейт
+MESSAGE_CHANGE = "change"  # В обе стороны: изменение для кэшей БД (событие, аргументы)
+MESSAGE_WRITE = "write"  # Воркер -> супервизор: операция записи (номер запроса, операция)
+MESSAGE_WRITE_RESULT = "write_result"  # Супервизор -> воркер: (номер запроса, ошибка, результат)
+MESSAGE_STOP = "stop"  # Супервизор -> воркер: завершить работу
+MESSAGE_STOPPED = "stopped"  # Воркер -> супервизор: записи дописаны, канал можно закрыть
+
+# Пауза перед перезапуском упавшего воркера (секунды)
+RESTART_DELAY = 1.0
+
+
+def shard_for(user_id: int, workers: int) -> int:
+    """Номер воркера для пользователя: все его апдейты и FSM-сессия живут в одном процессе"""
+    return user_id % workers
+
+
+class WorkerLink:
+    """
+    Канал между супервизором и воркером поверх multiprocessing.Pipe
+    
+    Отправка и чтение идут в отдельных потоках, чтобы не блокировать цикл
+    событий; порядок сообщений сохраняется.
+    """
+    
+    def __init__(self, conn: Connection):
+        self.conn = conn
+        self._sender = ThreadPoolExecutor(max_workers=1)
+        self._receiver = ThreadPoolExecutor(max_workers=1)
+    
+    def send(self, *message: Any) -> "Future[bool]":
+        """Поставить сообщение в очередь на отправку, не дожидаясь ее"""
+        return self._sender.submit(self._send, message)
+    
+    def _send(self, message: tuple) -> bool:
+        try:
+            self.conn.send(message)
+        except Exception as e:
+            logger.warning(f"⚠️ Не удалось передать сообщение {message[0]}: {e}")
+            return False
+        return True
+    
+    async def messages(self) -> AsyncIterator[tuple]:
+        """Входящие сообщения, пока другая сторона не закроет канал"""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                yield await loop.run_in_executor(self._receiver, self.conn.recv)
+            except (EOFError, OSError):
+                return
+    
+    def close(self):
+        self._sender.shutdown(wait=True)
+        self.conn.close()
+        self._receiver.shutdown(wait=False)
+
+
+class RemoteWriter:
+    """
+    Запись в БД из воркера: операции уходят супервизору и выполняются его
+    DatabaseWriter, так что в файл базы пишет одно соединение на все процессы
+    
+    Подставляется в Database вместо DatabaseWriter. Операции должны
+    передаваться через pickle (BoundWrite). Повторы при занятой базе делает
+    супервизор - ошибка операции приходит сюда уже после них.
+    """
+    
+    def __init__(self, link: WorkerLink):
+        self._link = link
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_id = 0
+        self._closed = False
+        self.operations = 0
+    
+    async def open(self) -> None:
+        """Своего соединения нет: схему создает и мигрирует супервизор"""
+        return None
+    
+    def start(self):
+        pass
+    
+    async def submit(self, operation: WriteOperation) -> Any:
+        """Отправить операцию супервизору и дождаться фиксации ее транзакции"""
+        if self._closed:
+            raise RuntimeError("Запись в БД уже остановлена")
+        loop = asyncio.get_running_loop()
+        self._next_id += 1
+        request_id = self._next_id
+        future = loop.create_future()
+        self._pending[request_id] = future
+        
+        def on_sent(sent: "Future[bool]"):
+            if not sent.result():
+                loop.call_soon_threadsafe(
+                    self.resolve, request_id, RuntimeError("Операция записи не передана супервизору"), None
+                )
+        
+        self._link.send(MESSAGE_WRITE, request_id, operation).add_done_callback(on_sent)
+        try:
+            result = await future
+        finally:
+            self._pending.pop(request_id, None)
+        self.operations += 1
+        return result
+    
+    def resolve(self, request_id: int, error: Optional[BaseException], result: Any):
+        """Передать ожидающему результат операции от супервизора"""
+        future = self._pending.pop(request_id, None)
+        if future is None or future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    
+    def fail_pending(self):
+        """Канал закрыт: ответов на отправленные операции уже не будет"""
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Супервизор недоступен, результат записи неизвестен"))
+    
+    def stats(self) -> WriterStats:
+        # Пачки и транзакции считает супервизор
+        return WriterStats(operations=self.operations, batches=0, max_batch=0)
+    
+    async def close(self):
+        self._closed = True
+        self.fail_pending()
+
+
+class Supervisor:
+    """
+    Запускает воркеров, раздает им апдейты по user_id, выполняет их записи
+    в БД и пересылает изменения кэшей от одного воркера всем остальным
+    """
+    
+    def __init__(
+        self,
+        workers: int,
+        target: Callable[[int, Connection], None],
+        on_write: Callable[[WriteOperation], Awaitable[Any]],
+        on_change: Optional[Callable[[str, tuple], None]] = None
+    ):
+        """
+        Args:
+            workers: Количество процессов-воркеров
+            target: Точка входа воркера target(номер, канал); должна импортироваться
+                    по имени модуля, потому что процессы запускаются через spawn
+            on_write: Выполнить операцию записи воркера (Database.write супервизора)
+            on_change: Применить изменение от воркера в самом супервизоре
+        """
+        self.workers = workers
+        self._target = target
+        self._on_write = on_write
+        self._on_change = on_change
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: List[Optional[multiprocessing.Process]] = [None] * workers
+        self._links: List[Optional[WorkerLink]] = [None] * workers
+        self._readers: Set[asyncio.Task] = set()
+        self._writes: Set[asyncio.Task] = set()
+        self._closing = False
+    
+    def start(self):
+        for index in range(self.workers):
+            self._start_worker(index)
+        logger.info(f"✅ Запущено воркеров: {self.workers}")
+    
+    def _start_worker(self, index: int):
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=self._target, args=(index, child_conn), name=f"worker-{index}", daemon=True
+        )
+        process.start()
+        # Копия канала нужна только воркеру
+        child_conn.close()
+        
+        link = WorkerLink(parent_conn)
+        self._processes[index] = process
+        self._links[index] = link
+        reader = asyncio.create_task(self._read(index, link, process))
+        self._readers.add(reader)
+        reader.add_done_callback(self._readers.discard)
+    
+    async def _read(self, index: int, link: WorkerLink, process: multiprocessing.Process):
+        async for message in link.messages():
+            kind = message[0]
+            if kind == MESSAGE_WRITE:
+                task = asyncio.create_task(self._write(index, link, *message[1:]))
+                self._writes.add(task)
+                task.add_done_callback(self._writes.discard)
+            elif kind == MESSAGE_CHANGE:
+                self.publish_change(*message[1:], exclude=index)
+                if self._on_change is not None:
+                    self._on_change(*message[1:])
+            elif kind == MESSAGE_STOPPED:
+                break
+        
+        # Канал закрыт - воркер завершился
+        self._links[index] = None
+        link.close()
+        if self._closing:
+            return
+        await asyncio.get_running_loop().run_in_executor(None, process.join)
+        logger.error(f"❌ Воркер {index} завершился (код {process.exitcode}), перезапускаем")
+        await asyncio.sleep(RESTART_DELAY)
+        if not self._closing:
+            self._start_worker(index)
+    
+    async def _write(self, index: int, link: WorkerLink, request_id: int, operation: WriteOperation):
+        """Выполнить запись воркера и вернуть ему результат"""
+        error = None
+        result = None
+        try:
+            result = await self._on_write(operation)
+        except Exception as e:
+            error = _portable_error(e)
+        if self._links[index] is link:
+            link.send(MESSAGE_WRITE_RESULT, request_id, error, result)
+    
+    def route(self, user_id: int, update: dict):
+        """Передать апдейт воркеру, который обслуживает пользователя"""
+        index = shard_for(user_id, self.workers)
+        link = self._links[index]
+        if link is None:
+            logger.warning(f"⚠️ Воркер {index} перезапускается, апдейт {update.get('update_id')} пропущен")
+            return
+        link.send(MESSAGE_UPDATE, update)
+    
+    def publish_change(self, event: str, args: tuple, exclude: Optional[int] = None):
+        """Разослать изменение кэшей всем воркерам, кроме exclude"""
+        for index, link in enumerate(self._links):
+            if index != exclude and link is not None:
+                link.send(MESSAGE_CHANGE, event, args)
+    
+    async def close(self, timeout: float = 15.0):
+        """Попросить воркеров завершиться, дождаться их и остановить оставшихся"""
+        self._closing = True
+        for link in self._links:
+            if link is not None:
+                link.send(MESSAGE_STOP)
+        
+        loop = asyncio.get_running_loop()
+        for index, process in enumerate(self._processes):
+            if process is None:
+                continue
+            await loop.run_in_executor(None, process.join, timeout)
+            if process.is_alive():
+                logger.warning(f"⚠️ Воркер {index} не завершился за {timeout} с, останавливаем принудительно")
+                process.terminate()
+                await loop.run_in_executor(None, process.join)
+        
+        if self._readers:
+            await asyncio.wait(list(self._readers), timeout=timeout)
+        if self._writes:
+            await asyncio.wait(list(self._writes), timeout=timeout)
+
+
+def _portable_error(error: Exception) -> Exception:
+    """Исключение, которое переживет pickle по пути в другой процесс"""
+    try:
+        pickle.loads(pickle.dumps(error))
+        return error
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {error}")
+
+
+async def serve_supervisor(
+    link: WorkerLink,
+    handle_update: Callable[[dict], Awaitable[Any]],
+    handle_change: Callable[[str, tuple], None],
+    writer: RemoteWriter,
+    shutdown: Callable[[], Awaitable[Any]],
+    shutdown_timeout: float = 10.0
+):
+    """
+    Цикл воркера: обрабатывать апдейты от супервизора, пока он не пришлет stop
+    (или не закроет канал)
+    
+    Апдейты обрабатываются параллельно, как при polling. После stop канал
+    читается дальше, пока shutdown() дописывает данные через супервизор;
+    затем воркер сообщает stopped, и супервизор закрывает канал.
+    """
+    tasks: Set[asyncio.Task] = set()
+    stopping = asyncio.Event()
+    
+    async def read():
+        try:
+            async for message in link.messages():
+                kind = message[0]
+                if kind == MESSAGE_UPDATE:
+                    task = asyncio.create_task(handle_update(message[1]))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                elif kind == MESSAGE_WRITE_RESULT:
+                    writer.resolve(*message[1:])
+                elif kind == MESSAGE_CHANGE:
+                    handle_change(*message[1:])
+                elif kind == MESSAGE_STOP:
+                    stopping.set()
+        finally:
+            # Канал закрыт - ответов на записи больше не будет
+            writer.fail_pending()
+            stopping.set()
+    
+    reader = asyncio.create_task(read())
+    await stopping.wait()
+    
+    # Даем дообработать уже полученные апдейты
+    if tasks:
+        await asyncio.wait(list(tasks), timeout=shutdown_timeout)
+    try:
+        await shutdown()
+    finally:
+        link.send(MESSAGE_STOPPED)
+        await asyncio.wait([reader], timeout=shutdown_timeout)